@@ -0,0 +1,204 @@
+"""Общий кэш ассетов процесса и фоновая предзагрузка.
+
+Текстуры, звуки и разобранные .tmx загружаются один раз за процесс:
+повторные «Новая игра»/«Загрузить игру» берут уже декодированные данные.
+Декодирование идёт в рабочем потоке, пока показывается главное меню; в
+текстурный атлас (GPU) текстуры кладутся порциями в главном потоке —
+OpenGL-контекст доступен только там.
+
+Время загрузки каждого ассета:  python assets.py
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import arcade
+import pytiled_parser
+
+from constants import MAP_NAME, BOOK_DROP_SOUND
+
+# Что нужно игре; visitor_2..10.png не используются и не грузятся
+TEXTURES = ["ghost.png", "ghost_l.png", "visitor_1.png", "book.png", "bookshelf.png",
+            "table.png", "power_zone.png"]
+SOUNDS = [BOOK_DROP_SOUND]
+MAPS = [MAP_NAME]                     # Изображения их тайлсетов предзагружаются следом
+
+CACHE_BUDGET = 512 * 1024 * 1024      # Байт декодированных данных до вытеснения (LRU)
+ATLAS_UPLOADS_PER_FRAME = 2           # Сколько текстур класть в атлас за кадр
+
+
+def _load_texture(name):
+    texture = arcade.load_texture(name)
+    return texture, texture.width * texture.height * 4
+
+
+def _load_sound(name):
+    return arcade.load_sound(name), os.path.getsize(name)
+
+
+def _load_map(name):
+    return pytiled_parser.parse_map(arcade.resources.resolve(name)), os.path.getsize(name)
+
+
+# "image" — текстура-источник (тайлсет): из неё вырезают тайлы, в атлас она не кладётся
+LOADERS = {"texture": _load_texture, "image": _load_texture, "sound": _load_sound, "map": _load_map}
+
+
+def tileset_image_path(tiled_map, image):
+    """Путь изображения тайлсета — ключ вида "image" в кэше (поиск как в arcade.TileMap)"""
+    if not os.path.exists(image) and tiled_map.map_file is not None:
+        image = os.path.join(os.path.dirname(tiled_map.map_file), image)
+    return str(image)
+
+
+def tileset_images(tiled_map):
+    """Пути изображений всех тайлсетов разобранной карты"""
+    paths = []
+    for tileset in tiled_map.tilesets.values():
+        if tileset.image is not None:
+            paths.append(tileset_image_path(tiled_map, tileset.image))
+        for tile in (tileset.tiles or {}).values():
+            if tile.image is not None:
+                paths.append(tileset_image_path(tiled_map, tile.image))
+    return paths
+
+
+class AssetManager:
+    """LRU-кэш ассетов с фоновой предзагрузкой и замером времени загрузки"""
+
+    def __init__(self, budget=CACHE_BUDGET):
+        self.budget = budget
+        self.cache = OrderedDict()        # (вид, имя) -> ассет, от давно использованных к свежим
+        self.sizes = {}                   # (вид, имя) -> байт
+        self.timings = {}                 # (вид, имя) -> секунд на загрузку
+        self.pending = {}                 # (вид, имя) -> Future фоновой загрузки
+        self.failed = {}                  # (вид, имя) -> исключение неудачной загрузки
+        self.lock = threading.RLock()
+        self.executor = None
+        self.to_upload = []               # Текстуры, ещё не положенные в атлас
+
+    # --- Доступ ---
+    def texture(self, name):
+        return self.get("texture", name)
+
+    def sound(self, name):
+        return self.get("sound", name)
+
+    def get(self, kind, name):
+        """Ассет из кэша; ждёт фоновую загрузку или грузит синхронно
+
+        Неудавшаяся загрузка не повторяется: снова выбрасывается её ошибка.
+        """
+        key = (kind, name)
+        with self.lock:
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                return self.cache[key]
+            if key in self.failed:
+                raise self.failed[key]
+            future = self.pending.get(key)
+        if future is not None:
+            return future.result()
+        return self._load(key)
+
+    def _load(self, key):
+        kind, name = key
+        start = time.perf_counter()
+        try:
+            asset, size = LOADERS[kind](name)
+        except Exception as error:
+            # Ошибка доходит до того, кто запросит ассет; предзагрузка не зависает
+            with self.lock:
+                self.pending.pop(key, None)
+                self.failed[key] = error
+            raise
+        elapsed = time.perf_counter() - start
+        with self.lock:
+            if kind == "map" and self.executor is not None:
+                # Тайлсеты известны только после разбора карты; ставим их в очередь,
+                # пока карта ещё числится в pending, чтобы ready не мигнул раньше времени
+                self.preload(textures=(), sounds=(), maps=(), images=tileset_images(asset))
+            self.cache[key] = asset
+            self.sizes[key] = size
+            self.timings[key] = elapsed
+            self.pending.pop(key, None)
+            self.failed.pop(key, None)
+            if kind == "texture":
+                self.to_upload.append(asset)
+            self._evict()
+        return asset
+
+    def _evict(self):
+        """Вытеснить давно не использованные ассеты сверх бюджета"""
+        total = sum(self.sizes.values())
+        while total > self.budget and len(self.cache) > 1:
+            key, asset = self.cache.popitem(last=False)
+            total -= self.sizes.pop(key)
+            if asset in self.to_upload:
+                self.to_upload.remove(asset)
+
+    # --- Предзагрузка ---
+    def preload(self, textures=TEXTURES, sounds=SOUNDS, maps=MAPS, images=()):
+        """Запустить загрузку в рабочем потоке (повторные вызовы ничего не грузят дважды)"""
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="assets")
+        keys = ([("map", n) for n in maps] + [("texture", n) for n in textures]
+                + [("sound", n) for n in sounds] + [("image", n) for n in images])
+        with self.lock:
+            for key in keys:
+                if key not in self.cache and key not in self.pending and key not in self.failed:
+                    self.pending[key] = self.executor.submit(self._load, key)
+
+    @property
+    def progress(self):
+        """Доля завершённой предзагрузки (0.0–1.0)"""
+        with self.lock:
+            done = len(self.cache) + len(self.failed)
+            total = done + len(self.pending)
+            return done / total if total else 1.0
+
+    @property
+    def ready(self):
+        with self.lock:
+            return not self.pending
+
+    def upload_to_atlas(self, limit=ATLAS_UPLOADS_PER_FRAME):
+        """Положить до limit загруженных текстур в общий атлас (только главный поток)"""
+        atlas = arcade.get_window().ctx.default_atlas
+        with self.lock:
+            batch, self.to_upload = self.to_upload[:limit], self.to_upload[limit:]
+        for texture in batch:
+            atlas.add(texture)
+        return len(batch)
+
+    def report(self):
+        """Строки с временем загрузки каждого ассета, от самых медленных"""
+        with self.lock:
+            items = sorted(self.timings.items(), key=lambda item: item[1], reverse=True)
+        lines = [f"{kind:>7} {name:<20} {seconds * 1000:7.1f} мс" for (kind, name), seconds in items]
+        lines.append(f"  всего {sum(seconds for _, seconds in items) * 1000:.1f} мс")
+        return lines
+
+
+# Один кэш на процесс
+ASSETS = AssetManager()
+
+
+def main():
+    """Предзагрузить всё, что нужно игре, и напечатать время загрузки"""
+    start = time.perf_counter()
+    ASSETS.preload()
+    while not ASSETS.ready:
+        time.sleep(0.01)
+    for line in ASSETS.report():
+        print(line)
+    for kind, name in sorted(ASSETS.failed):
+        print(f"{kind:>7} {name:<20}  не загружен")
+    print(f"предзагрузка в фоне: {(time.perf_counter() - start) * 1000:.1f} мс")
+    ASSETS.executor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+# === ГЛОБАЛЬНЫЕ КОНСТАНТЫ ===
+# Вынесены из main.py, чтобы игровые правила можно было импортировать без arcade
+# (headless-симуляция, пакетный прогон балансировки).
+
+SPEED = 4                             # Базовая скорость игрока
+SCREEN_WIDTH = 1500
+SCREEN_HEIGHT = 700
+CAMERA_LERP = 0.13                   # Плавность камеры (0.0–1.0)
+SCREEN_TITLE = "Fantom of library"
+
+BUTTON_WIDTH = 300
+BUTTON_HEIGHT = 80
+VISITOR_SCALE = 6                     # Масштаб спрайта посетителя
+PLAYER_SCALE = 0.35
+TABLE_SCALE = 0.3
+BOOKSHELF_SCALE = 0.25
+FLOATING_BOOK_SCALE = 0.1             # Очень маленькая книга при сбросе
+POWER_ZONE_SCALE = 0.2
+POWER_ZONE_SIZE = 80                  # Радиус действия зоны силы
+
+INTERACTION_DISTANCE = 80              # Дистанция взаимодействия с шкафом/книгой
+MANA_COST_INTERACTION = 20            # Стоимость сброса книги
+DAY_DURATION = 60.0                   # 1 игровой день = 60 сек реального времени
+TIME_SCALES = (1.0, 10.0, 100.0)      # Ускорение времени (переключается клавишей T)
+
+# === ПРАВИЛА СИМУЛЯЦИИ ===
+MAP_NAME = "library.tmx"
+BOOK_DROP_SOUND = "../sounds/book_drop.wav"   # Звуки лежат в sounds/ рядом с venv/
+SIM_FIXED_DT = 1 / 60                 # Фиксированный шаг симуляции (сек)
+SPRINT_MANA_COST = 2.0                # Расход маны в секунду при беге
+POWER_ZONE_REGEN_MULT = 3.0           # Множитель регена в зоне силы
+
+VISITOR_SPEED = 100                   # Скорость посетителя (пикс/сек)
+VISITOR_Y = 118                       # Фиксированная Y-координата посетителя
+VISITOR_ENTRANCE_X = 100              # Точка появления (вход слева)
+VISITOR_EXIT_X = 50                   # Точка ухода
+VISITOR_ARRIVE_EPS = 5                # Допуск при достижении цели
+VISITOR_POST_WAIT = 5.0               # Ожидание за столом после получения книги
+BOOK_REWARD = 10                      # Очки за выданную книгу
+FLOATING_BOOK_Y = 90
+
+FIRST_SPAWN_DELAY = (3.0, 6.0)        # Задержка первого посетителя дня
+RESPAWN_DELAY = (4.0, 8.0)            # Задержка после ухода посетителя
+QUEST_DELAY = (3.0, 8.0)              # Задержка перед появлением задания
+
+# Размеры исходных текстур (нужны для расстановки объектов без их загрузки)
+TABLE_TEXTURE_SIZE = (237, 238)
+BOOKSHELF_TEXTURE_SIZE = (840, 970)
+
+TILE_SIZE = 70                        # Размер тайла library.tmx (ячейка пространственного индекса)
@@ -0,0 +1,221 @@
+"""Толпа посетителей в виде структуры массивов (NumPy).
+
+Каждый посетитель — индекс в общих массивах позиций, состояний, целей,
+столов и таймеров. Живые посетители всегда лежат плотно в [0, count),
+поэтому движение и переходы состояний считаются одной векторной операцией
+на кадр, а не ветвлением по каждому объекту. Путь к цели задаёт поле потока
+(navigation.py), номер которого хранится у посетителя.
+
+Замер:  python crowd.py --visitors 500
+"""
+import argparse
+import math
+import time
+
+import numpy as np
+
+from constants import VISITOR_SPEED, VISITOR_ARRIVE_EPS
+
+# Состояния посетителя
+ARRIVING = 0
+WAITING = 1
+GOING_TO_BOOK = 2
+RETURNING_TO_TABLE = 3
+POST_INTERACTION_WAIT = 4
+LEAVING = 5
+
+STATE_NAMES = ["arriving", "waiting", "going_to_book", "returning_to_table",
+               "post_interaction_wait", "leaving"]
+STATE_COUNT = len(STATE_NAMES)
+
+# Таблица: идёт ли посетитель к цели в данном состоянии
+IS_MOVING = np.zeros(STATE_COUNT, dtype=bool)
+IS_MOVING[[ARRIVING, GOING_TO_BOOK, RETURNING_TO_TABLE, LEAVING]] = True
+IS_MOVING_LIST = IS_MOVING.tolist()
+
+# До стольких посетителей шаг считается циклом по скалярам: на коротких
+# массивах накладные расходы вызовов NumPy дороже самой арифметики
+SCALAR_CROWD = 16
+
+
+class VisitorCrowd:
+    """Пул посетителей: плотные массивы с удалением через перестановку"""
+
+    FIELDS = ("ids", "x", "y", "state", "target_x", "target_y", "field", "table", "timer", "quest_done")
+
+    def __init__(self, capacity=16):
+        self.count = 0
+        self.next_id = 0
+        self.counts = [0] * STATE_COUNT      # Посетителей в каждом состоянии
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        self.ids = np.zeros(capacity, dtype=np.int64)
+        self.x = np.zeros(capacity, dtype=np.float64)
+        self.y = np.zeros(capacity, dtype=np.float64)
+        self.state = np.zeros(capacity, dtype=np.int8)
+        self.target_x = np.zeros(capacity, dtype=np.float64)
+        self.target_y = np.zeros(capacity, dtype=np.float64)
+        self.field = np.zeros(capacity, dtype=np.int32)        # Поле потока к цели
+        self.table = np.zeros(capacity, dtype=np.int32)
+        self.timer = np.zeros(capacity, dtype=np.float64)      # Ожидание задания / конец ожидания
+        self.quest_done = np.zeros(capacity, dtype=bool)
+
+    @property
+    def capacity(self):
+        return len(self.ids)
+
+    def _grow(self):
+        old = {name: getattr(self, name) for name in self.FIELDS}
+        self._allocate(self.capacity * 2)
+        for name, values in old.items():
+            getattr(self, name)[:self.count] = values[:self.count]
+
+    def __len__(self):
+        return self.count
+
+    def spawn(self, x, y, target_x, target_y, field, table, quest_delay):
+        """Добавить посетителя; возвращает его id"""
+        if self.count == self.capacity:
+            self._grow()
+        i = self.count
+        self.next_id += 1
+        self.ids[i] = self.next_id
+        self.x[i] = x
+        self.y[i] = y
+        self.state[i] = ARRIVING
+        self.target_x[i] = target_x
+        self.target_y[i] = target_y
+        self.field[i] = field
+        self.table[i] = table
+        self.timer[i] = quest_delay
+        self.quest_done[i] = False
+        self.count += 1
+        self.counts[ARRIVING] += 1
+        return self.next_id
+
+    def remove(self, indices):
+        """Удалить посетителей по индексам (последний живой встаёт на место удалённого)"""
+        for i in sorted(np.asarray(indices).tolist(), reverse=True):
+            last = self.count - 1
+            self.counts[self.state[i]] -= 1
+            if i != last:
+                for name in self.FIELDS:
+                    values = getattr(self, name)
+                    values[i] = values[last]
+            self.count -= 1
+
+    def snapshot(self):
+        """Копии живой части массивов (для сохранения)"""
+        return {name: self.view(name).copy() for name in self.FIELDS}
+
+    def restore(self, arrays, next_id):
+        """Заменить содержимое пула массивами из снимка"""
+        count = len(arrays["ids"])
+        self._allocate(max(16, count))
+        for name in self.FIELDS:
+            getattr(self, name)[:count] = arrays[name]
+        self.count = count
+        self.next_id = next_id
+        self.recount()
+
+    def recount(self):
+        """Пересчитать посетителей по состояниям (после смены состояний массивом)"""
+        self.counts = np.bincount(self.state[:self.count], minlength=STATE_COUNT).tolist()
+
+    def moving_count(self):
+        counts = self.counts
+        return counts[ARRIVING] + counts[GOING_TO_BOOK] + counts[RETURNING_TO_TABLE] + counts[LEAVING]
+
+    # --- Векторные представления живой части ---
+    def view(self, name):
+        return getattr(self, name)[:self.count]
+
+    def move(self, delta_time, navigator):
+        """Шаг всех идущих посетителей по полям потоков; индексы прибывших
+
+        Вне клетки цели посетитель идёт по направлению поля, в ней (и там,
+        где поле не ведёт) — прямо к точке цели.
+        """
+        n = self.count
+        if n <= SCALAR_CROWD:
+            return self._move_scalar(delta_time, navigator)
+        x, y = self.x[:n], self.y[:n]
+        dx = self.target_x[:n] - x
+        dy = self.target_y[:n] - y
+        dist = np.hypot(dx, dy)
+        moving = IS_MOVING[self.state[:n]]
+        near = dist < VISITOR_ARRIVE_EPS
+        step = (moving & ~near) * (VISITOR_SPEED * delta_time)
+
+        # Для стоящих (step == 0) делитель любой ненулевой — смещение всё равно ноль
+        dist[dist == 0] = 1.0
+        ux, uy = dx / dist, dy / dist
+        # Поле нужно только идущим вне клетки цели — в ней шаг всегда прямой
+        fields = self.field[:n]
+        cells = navigator.cell_index(x, y)
+        outside = np.flatnonzero(step.astype(bool) & (cells != navigator.goal_index[fields]))
+        if len(outside):
+            flow = navigator.flow[fields[outside] * navigator.blocked.size + cells[outside]]
+            steer = flow.any(axis=1)
+            ux[outside[steer]] = flow[steer, 0]
+            uy[outside[steer]] = flow[steer, 1]
+        x += ux * step
+        y += uy * step
+        return np.flatnonzero(moving & near)
+
+    def _move_scalar(self, delta_time, navigator):
+        """То же, что move(), циклом по посетителям (для маленькой толпы)"""
+        n = self.count
+        step = VISITOR_SPEED * delta_time
+        arrived = []
+        rows = zip(self.state[:n].tolist(), self.x[:n].tolist(), self.y[:n].tolist(),
+                   self.target_x[:n].tolist(), self.target_y[:n].tolist(), self.field[:n].tolist())
+        for i, (state, x, y, target_x, target_y, field) in enumerate(rows):
+            if not IS_MOVING_LIST[state]:
+                continue
+            dx, dy = target_x - x, target_y - y
+            dist = math.hypot(dx, dy)
+            if dist < VISITOR_ARRIVE_EPS:
+                arrived.append(i)
+                continue
+            flow_x, flow_y = navigator.direction(field, x, y)
+            if flow_x or flow_y:
+                self.x[i] = x + flow_x * step
+                self.y[i] = y + flow_y * step
+            else:
+                self.x[i] = x + dx / dist * step
+                self.y[i] = y + dy / dist * step
+        return np.array(arrived, dtype=np.intp)
+
+
+def benchmark(visitors=500, seconds=10.0):
+    """Среднее время шага симуляции с толпой из visitors посетителей"""
+    from constants import SIM_FIXED_DT
+    from simulation import LibrarySimulation, GhostBot, read_map_size
+
+    sim = LibrarySimulation(*read_map_size(), seed=0,
+                            overrides={"max_visitors": visitors, "spawn_interval": (0.0, 0.0)})
+    bot = GhostBot(sim, 7 * 64 + 32, 5 * 64 + 32)
+    while len(sim.crowd) < visitors:
+        sim.step(SIM_FIXED_DT)
+    steps = int(seconds / SIM_FIXED_DT)
+    start = time.perf_counter()
+    for _ in range(steps):
+        bot.update(SIM_FIXED_DT)
+        sim.step(SIM_FIXED_DT)
+    return (time.perf_counter() - start) / steps
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Замер шага симуляции с толпой посетителей")
+    parser.add_argument("--visitors", type=int, default=500)
+    parser.add_argument("--seconds", type=float, default=10.0, help="игровых секунд замера")
+    args = parser.parse_args()
+    per_step = benchmark(args.visitors, args.seconds)
+    print(f"{args.visitors} посетителей: {per_step * 1000:.3f} мс/шаг "
+          f"({per_step * 60 * 100:.1f}% бюджета кадра 60 FPS)")
+
+
+if __name__ == "__main__":
+    main()
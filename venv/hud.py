@@ -0,0 +1,248 @@
+"""Retained-mode HUD: кэшированные arcade.Text и списки фигур.
+
+Текст и геометрия HUD создаются один раз; каждый кадр Hud.update()
+сравнивает ключи (очки, целая мана, игровой час, уведомление) с прошлыми
+и перестраивает только изменившиеся элементы. Рисование — три вызова:
+статические фигуры, полоса маны и один пакет (pyglet Batch) со всем текстом.
+
+Замер против прежнего immediate-mode пути:  python hud.py --frames 600
+"""
+import argparse
+import time
+
+import arcade
+import pyglet
+from arcade.shape_list import ShapeElementList, create_rectangle_filled, create_rectangle_outline
+
+from constants import SCREEN_WIDTH, SCREEN_HEIGHT
+
+# Геометрия HUD
+PANEL_WIDTH, PANEL_HEIGHT = 400, 120
+PANEL_X, PANEL_Y = 20, SCREEN_HEIGHT - PANEL_HEIGHT - 20
+MANA_BAR_X, MANA_BAR_Y = 20, 60
+MANA_BAR_WIDTH, MANA_BAR_HEIGHT = 200, 20
+HINTS = ["WASD - движение", "SHIFT - бег", "E - взаимодействие", "T - ускорение", "ESC - пауза"]
+
+
+def lrbt_rectangle_filled(left, right, bottom, top, color):
+    return create_rectangle_filled((left + right) / 2, (bottom + top) / 2, right - left, top - bottom, color)
+
+
+def lrbt_rectangle_outline(left, right, bottom, top, color, border_width):
+    return create_rectangle_outline((left + right) / 2, (bottom + top) / 2, right - left, top - bottom,
+                                    color, border_width)
+
+
+class Hud:
+    """HUD игрового экрана с перестройкой по изменившимся значениям"""
+
+    def __init__(self):
+        self.batch = pyglet.graphics.Batch()
+
+        # Статичная геометрия: панель заданий и рамка шкалы маны
+        self.static_shapes = ShapeElementList()
+        self.static_shapes.append(lrbt_rectangle_filled(
+            PANEL_X, PANEL_X + PANEL_WIDTH, PANEL_Y, PANEL_Y + PANEL_HEIGHT, (20, 20, 40, 220)))
+        self.static_shapes.append(lrbt_rectangle_outline(
+            PANEL_X, PANEL_X + PANEL_WIDTH, PANEL_Y, PANEL_Y + PANEL_HEIGHT, arcade.color.GOLD, 2))
+        self.static_shapes.append(lrbt_rectangle_outline(
+            MANA_BAR_X, MANA_BAR_X + MANA_BAR_WIDTH, MANA_BAR_Y, MANA_BAR_Y + MANA_BAR_HEIGHT,
+            arcade.color.WHITE, 2))
+        self.mana_fill = ShapeElementList()
+
+        # Тексты
+        arcade.Text("АКТИВНЫЕ ЗАДАНИЯ", PANEL_X + 20, PANEL_Y + PANEL_HEIGHT - 30,
+                    arcade.color.GOLD, 18, bold=True, batch=self.batch)
+        self.quest_text = arcade.Text("• Уронь книгу из шкафа (E)", PANEL_X + 30, PANEL_Y + PANEL_HEIGHT - 70,
+                                      arcade.color.WHITE, 14, batch=self.batch)
+        self.score_text = arcade.Text("", SCREEN_WIDTH - 20, SCREEN_HEIGHT - 40, arcade.color.GOLD, 16,
+                                      anchor_x="right", batch=self.batch)
+        self.mana_text = arcade.Text("", MANA_BAR_X + 210, MANA_BAR_Y + 5, arcade.color.WHITE, 14,
+                                     batch=self.batch)
+        self.clock_text = arcade.Text("", SCREEN_WIDTH - 20, 20, (200, 200, 255), 16,
+                                      anchor_x="right", batch=self.batch)
+        for i, hint in enumerate(HINTS):
+            arcade.Text(hint, SCREEN_WIDTH - 20, SCREEN_HEIGHT - 80 - i * 20, arcade.color.GRAY, 12,
+                        anchor_x="right", batch=self.batch)
+        self.notification_text = arcade.Text("", SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2 + 200,
+                                             arcade.color.GREEN, 28, anchor_x="center", bold=True,
+                                             batch=self.batch)
+
+        # Ключи последних отрисованных значений (None — требуется перестройка)
+        self.score_key = None
+        self.mana_key = None
+        self.clock_key = None
+        self.notification_key = None
+        self.rebuilds = 0
+
+    def update(self, sim, notification):
+        """Обновить элементы, чьи значения изменились с прошлого кадра"""
+        self.quest_text.visible = sim.quest_active
+
+        score_key = (sim.score, sim.visitors_helped)
+        if score_key != self.score_key:
+            self.score_key = score_key
+            self.score_text.text = f"Очки: {sim.score} | Помог: {sim.visitors_helped}"
+            self.rebuilds += 1
+
+        mana_key = (int(sim.mana), int(sim.max_mana))
+        if mana_key != self.mana_key:
+            self.mana_key = mana_key
+            self.mana_text.text = f"Мана: {mana_key[0]}/{mana_key[1]}"
+            self.mana_fill = ShapeElementList()
+            fill_width = (sim.mana / sim.max_mana) * MANA_BAR_WIDTH
+            if fill_width > 0:
+                self.mana_fill.append(lrbt_rectangle_filled(
+                    MANA_BAR_X, MANA_BAR_X + fill_width, MANA_BAR_Y, MANA_BAR_Y + MANA_BAR_HEIGHT,
+                    arcade.color.BLUE))
+            self.rebuilds += 1
+
+        clock_key = (int(sim.game_time) // 5, sim.is_night, sim.time_scale)    # Игровой час = 5 сек
+        if clock_key != self.clock_key:
+            self.clock_key = clock_key
+            speed = f" | ×{sim.time_scale:g}" if sim.time_scale != 1 else ""
+            self.clock_text.text = sim.get_time_display() + speed
+            self.rebuilds += 1
+
+        if notification != self.notification_key:
+            self.notification_key = notification
+            self.notification_text.text = notification or ""
+            self.notification_text.visible = bool(notification)
+            self.rebuilds += 1
+
+    def draw(self):
+        self.static_shapes.draw()
+        self.mana_fill.draw()
+        self.batch.draw()
+
+
+class ProfilerOverlay:
+    """Оверлей профайлера (F3): секции кадра, обновляется раз в REFRESH_FRAMES кадров"""
+
+    REFRESH_FRAMES = 30
+    MAX_LINES = 12
+
+    def __init__(self, profiler):
+        self.profiler = profiler
+        self.refreshed = -self.REFRESH_FRAMES
+        self.batch = pyglet.graphics.Batch()
+        top = SCREEN_HEIGHT - PANEL_HEIGHT - 60
+        self.background = ShapeElementList()
+        self.background.append(lrbt_rectangle_filled(
+            PANEL_X, PANEL_X + 300, top - self.MAX_LINES * 18 - 10, top + 24, (0, 0, 0, 180)))
+        arcade.Text("ПРОФАЙЛЕР (F4 — CSV)", PANEL_X + 10, top, arcade.color.YELLOW, 12,
+                    bold=True, batch=self.batch)
+        self.lines = [arcade.Text("", PANEL_X + 10, top - 20 - i * 18, arcade.color.WHITE, 11,
+                                  font_name="Courier New", batch=self.batch)
+                      for i in range(self.MAX_LINES)]
+
+    def update(self):
+        if self.profiler.frames - self.refreshed < self.REFRESH_FRAMES:
+            return
+        self.refreshed = self.profiler.frames
+        report = self.profiler.report()
+        for i, line in enumerate(self.lines):
+            line.text = report[i] if i < len(report) else ""
+
+    def draw(self):
+        self.background.draw()
+        self.batch.draw()
+
+
+def draw_immediate_hud(sim, notification):
+    """Прежний immediate-mode HUD из GameView.on_draw — эталон для замера"""
+    panel_x, panel_y = PANEL_X, PANEL_Y
+    arcade.draw_lrbt_rectangle_filled(panel_x, panel_x + PANEL_WIDTH, panel_y, panel_y + PANEL_HEIGHT, (20, 20, 40, 220))
+    arcade.draw_lrbt_rectangle_outline(panel_x, panel_x + PANEL_WIDTH, panel_y, panel_y + PANEL_HEIGHT, arcade.color.GOLD, 2)
+    arcade.draw_text("АКТИВНЫЕ ЗАДАНИЯ", panel_x + 20, panel_y + PANEL_HEIGHT - 30, arcade.color.GOLD, 18, bold=True)
+    if sim.quest_active:
+        arcade.draw_text("• Уронь книгу из шкафа (E)", panel_x + 30, panel_y + PANEL_HEIGHT - 70, arcade.color.WHITE, 14)
+    arcade.draw_text(f"Очки: {sim.score} | Помог: {sim.visitors_helped}", SCREEN_WIDTH - 20, SCREEN_HEIGHT - 40, arcade.color.GOLD, 16, anchor_x="right")
+    fill_width = (sim.mana / sim.max_mana) * MANA_BAR_WIDTH
+    if fill_width > 0:
+        arcade.draw_lrbt_rectangle_filled(MANA_BAR_X, MANA_BAR_X + fill_width, MANA_BAR_Y, MANA_BAR_Y + 20, arcade.color.BLUE)
+    arcade.draw_lrbt_rectangle_outline(MANA_BAR_X, MANA_BAR_X + 200, MANA_BAR_Y, MANA_BAR_Y + 20, arcade.color.WHITE, 2)
+    arcade.draw_text(f"Мана: {int(sim.mana)}/{int(sim.max_mana)}", MANA_BAR_X + 210, MANA_BAR_Y + 5, arcade.color.WHITE, 14)
+    arcade.draw_text(sim.get_time_display(), SCREEN_WIDTH - 20, 20, (200, 200, 255), 16, anchor_x="right")
+    for i, hint in enumerate(HINTS):
+        arcade.draw_text(hint, SCREEN_WIDTH - 20, SCREEN_HEIGHT - 80 - i * 20, arcade.color.GRAY, 12, anchor_x="right")
+    if notification:
+        arcade.draw_text(notification, SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2 + 200, arcade.color.GREEN, 28, anchor_x="center", bold=True)
+
+
+# === ЗАМЕР ===
+class DrawCallCounter:
+    """Подсчёт вызовов glDraw* (arcade и pyglet) на время блока with"""
+
+    MODULES = (pyglet.gl, pyglet.graphics.vertexdomain)
+
+    def __init__(self):
+        self.count = 0
+        self.patched = []
+
+    def __enter__(self):
+        for module in self.MODULES:
+            for name in dir(module):
+                if name.startswith("glDraw") and not name.startswith("glDrawBuffer"):
+                    original = getattr(module, name)
+                    setattr(module, name, self._wrap(original))
+                    self.patched.append((module, name, original))
+        return self
+
+    def _wrap(self, func):
+        def counted(*args):
+            self.count += 1
+            return func(*args)
+        return counted
+
+    def __exit__(self, *exc):
+        for module, name, original in self.patched:
+            setattr(module, name, original)
+        self.patched.clear()
+
+
+def benchmark(frames=600):
+    """CPU-время кадра и число draw-вызовов HUD: прежний путь против Hud"""
+    from constants import SIM_FIXED_DT
+    from simulation import LibrarySimulation, read_map_size
+
+    window = arcade.Window(SCREEN_WIDTH, SCREEN_HEIGHT, "HUD benchmark", visible=False)
+    results = {}
+    for name in ("immediate", "retained"):
+        sim = LibrarySimulation(*read_map_size(), seed=0)
+        hud = Hud()
+        times = []
+        with DrawCallCounter() as counter:
+            for frame in range(frames):
+                sim.step(SIM_FIXED_DT)
+                notification = "Игра сохранена!" if frame % 300 < 180 else None
+                start = time.perf_counter()
+                window.clear()
+                if name == "immediate":
+                    draw_immediate_hud(sim, notification)
+                else:
+                    hud.update(sim, notification)
+                    hud.draw()
+                window.ctx.finish()
+                times.append(time.perf_counter() - start)
+        times.sort()
+        results[name] = {
+            "mean_ms": sum(times) / frames * 1000,
+            "p95_ms": times[int(frames * 0.95)] * 1000,
+            "draw_calls": counter.count / frames,
+        }
+    window.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Замер отрисовки HUD")
+    parser.add_argument("--frames", type=int, default=600)
+    args = parser.parse_args()
+    for name, r in benchmark(args.frames).items():
+        print(f"{name:>9}: {r['mean_ms']:.3f} мс/кадр (p95 {r['p95_ms']:.3f}), "
+              f"{r['draw_calls']:.1f} draw-вызовов/кадр")
+
+
+if __name__ == "__main__":
+    main()
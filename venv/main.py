@@ -0,0 +1,610 @@
+import arcade
+import random
+import math
+import time
+from pathlib import Path
+
+# === ГЛОБАЛЬНЫЕ КОНСТАНТЫ (constants.py) ===
+from constants import (
+    SPEED, SCREEN_WIDTH, SCREEN_HEIGHT, CAMERA_LERP, SCREEN_TITLE,
+    BUTTON_WIDTH, BUTTON_HEIGHT, VISITOR_SCALE, PLAYER_SCALE, TABLE_SCALE,
+    BOOKSHELF_SCALE, FLOATING_BOOK_SCALE, POWER_ZONE_SCALE, MAP_NAME, TIME_SCALES, BOOK_DROP_SOUND,
+)
+from simulation import LibrarySimulation, format_game_time
+from hud import Hud, ProfilerOverlay
+from assets import ASSETS
+from saves import SaveStore, SaveError, AUTOSAVE_INTERVAL
+from streaming import ChunkedTileMap
+from tmx import COLLISION_LAYER
+from profiler import FrameProfiler
+from replay import InputRecorder
+
+# Папка для сохранений (Documents/FantomOfLibrary)
+SAVE_FOLDER = Path.home() / "Documents" / "FantomOfLibrary"
+SAVE_FOLDER.mkdir(parents=True, exist_ok=True)
+SAVES = SaveStore(SAVE_FOLDER)
+REPLAY_FOLDER = SAVE_FOLDER / "replays"
+# Меню и отладочные клавиши в запись ввода не попадают
+UNRECORDED_KEYS = (arcade.key.ESCAPE, arcade.key.F3, arcade.key.F4, arcade.key.F10)
+
+
+# === КЛАСС: КНОПКА ===
+class Button:
+    def __init__(self, text: str, center_x: float, center_y: float,
+                 width=BUTTON_WIDTH, height=BUTTON_HEIGHT, color=arcade.color.DARK_GREEN):
+        self.text = text
+        self.center_x = center_x
+        self.center_y = center_y
+        self.width = width
+        self.height = height
+        self.color = color
+        self.text_color = arcade.color.WHITE
+        self.font_size = 24
+        self.label = arcade.Text(self.text, self.center_x, self.center_y, self.text_color,
+                                 self.font_size, anchor_x="center", anchor_y="center")
+
+    @property
+    def left(self): return self.center_x - self.width / 2
+    @property
+    def right(self): return self.center_x + self.width / 2
+    @property
+    def top(self): return self.center_y + self.height / 2
+    @property
+    def bottom(self): return self.center_y - self.height / 2
+
+    def draw(self):
+        rect = arcade.rect.XYWH(self.center_x, self.center_y, self.width, self.height)
+        arcade.draw_rect_filled(rect, self.color)
+        self.label.draw()
+
+    def is_clicked(self, x: float, y: float) -> bool:
+        return self.left < x < self.right and self.bottom < y < self.top
+
+
+# === ЭКРАН: ПАУЗА ===
+class PauseView(arcade.View):
+    def __init__(self, game_view):
+        super().__init__()
+        self.game_view = game_view
+        self.buttons = [
+            Button("Продолжить", SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2 + 100),
+            Button("Сохранить игру", SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2 + 20, color=arcade.color.DARK_BLUE),
+            Button("В главное меню", SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2 - 60, color=arcade.color.DARK_RED)
+        ]
+        self.title_text = arcade.Text("ПАУЗА", SCREEN_WIDTH / 2, SCREEN_HEIGHT - 100,
+                                      arcade.color.WHITE, font_size=48, anchor_x="center")
+        self.time_text = arcade.Text("", SCREEN_WIDTH / 2, SCREEN_HEIGHT - 150,
+                                     arcade.color.GOLD, 24, anchor_x="center")
+        self.background = None
+
+    def on_show_view(self):
+        self.capture_background()
+
+    def capture_background(self):
+        """Снимок игрового кадра: пока игра на паузе, мир не перерисовывается"""
+        self.game_view.on_draw()
+        self.background = arcade.Texture(arcade.get_image(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT))
+        self.time_text.text = f"Время: {self.game_view.get_time_display()}"
+
+    def on_update(self, delta_time: float):
+        # Результат фоновой записи показываем сразу, не дожидаясь выхода из паузы
+        if self.game_view.poll_saves():
+            self.capture_background()
+
+    def on_draw(self):
+        self.clear()
+        self.window.default_camera.use()
+        if self.background:
+            arcade.draw_texture_rect(self.background, arcade.rect.LBWH(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT))
+        rect = arcade.rect.XYWH(SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2, SCREEN_WIDTH * 0.8, SCREEN_HEIGHT * 0.8)
+        arcade.draw_rect_filled(rect, (20, 20, 40, 220))
+        arcade.draw_rect_outline(rect, arcade.color.GOLD, 3)
+
+        for button in self.buttons:
+            button.draw()
+        self.title_text.draw()
+        self.time_text.draw()
+
+    def on_mouse_press(self, x: float, y: float, button: int, modifiers: int):
+        for btn in self.buttons:
+            if btn.is_clicked(x, y):
+                if btn.text == "Продолжить":
+                    self.window.show_view(self.game_view)
+                elif btn.text == "Сохранить игру":
+                    self.game_view.save_game()
+                elif btn.text == "В главное меню":
+                    main_menu = MainMenu()
+                    self.window.show_view(main_menu)
+
+    def on_key_press(self, key, modifiers):
+        if key == arcade.key.ESCAPE:
+            self.window.show_view(self.game_view)
+
+
+# === ОСНОВНОЙ ИГРОВОЙ ЭКРАН ===
+class GameView(arcade.View):
+    def __init__(self, seed=None, autosave=True):
+        super().__init__()
+        # Карта из Tiled (.tmx): слои грузятся чанками вокруг камеры (см. streaming.py)
+        self.cell_size = 64
+        self.level = ChunkedTileMap.from_tiled_map(ASSETS.get("map", MAP_NAME))
+
+        # Динамические объекты поверх слоёв карты (шкафы, зоны силы, книги)
+        self.object_list = arcade.SpriteList()
+        self.power_zone_list = arcade.SpriteList()
+
+        # Списки спрайтов
+        self.all_sprites = arcade.SpriteList()
+        self.tables = arcade.SpriteList()
+        self.bookshelves = arcade.SpriteList()
+        self.floating_books = arcade.SpriteList()
+        self.visitor_sprites = arcade.SpriteList()   # Спрайт i ↔ посетитель i толпы
+
+        # Текстуры из общего кэша (декодированы при предзагрузке)
+        self.player_texture_right = ASSETS.texture('ghost.png')
+        self.player_texture_left = ASSETS.texture('ghost_l.png')
+        self.visitor_texture = ASSETS.texture('visitor_1.png')
+        self.book_texture = ASSETS.texture('book.png')
+        self.bookshelf_texture = ASSETS.texture('bookshelf.png')
+        self.table_texture = ASSETS.texture('table.png')
+        self.power_zone_texture = ASSETS.texture('power_zone.png')
+
+        # Камера и размеры карты
+        self.world_camera = arcade.camera.Camera2D()
+        self.map_width = self.level.width
+        self.map_height = self.level.height
+
+        # Игровая логика (headless-ядро, см. simulation.py)
+        # Посетители ходят по полям потоков над слоем collision той же карты.
+        # Сид всегда явный — иначе сессию нельзя повторить (см. replay.py)
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.sim = LibrarySimulation(self.map_width, self.map_height, seed=self.seed,
+                                     collision=self.level.grids.get(COLLISION_LAYER),
+                                     tile_size=self.level.tile_width)
+
+        # Игрок
+        self.player = arcade.Sprite(self.player_texture_right, scale=PLAYER_SCALE)
+        self.player.center_x = 7 * self.cell_size + self.cell_size // 2
+        self.player.center_y = 5 * self.cell_size + self.cell_size // 2
+        self.all_sprites.append(self.player)
+        # Стены физике подставляет update_streaming(): только чанки рядом с игроком
+        self.physics_engine = arcade.PhysicsEngineSimple(self.player)
+        self.update_streaming()
+
+        # Состояние представления
+        self.pulse_time = 0.0
+        self.notification = None
+        self.notification_timer = 0.0
+
+        # Сохранения пишутся в фоне; здесь — ещё не завершённые записи
+        self.pending_saves = []
+        self.autosave = autosave          # Повтор записи (replay.py) не пишет автосохранения
+        self.autosave_timer = 0.0
+
+        # Профайлер кадра (F3 — оверлей, F4 — CSV) и запись ввода (F10)
+        self.profiler = FrameProfiler()
+        self.profiler_overlay = ProfilerOverlay(self.profiler)
+        self.show_profiler = False
+        self.recorder = InputRecorder(self.seed)
+
+        # Спрайты книг симуляции по id
+        self.book_sprites = {}
+        self.hud = Hud()
+
+        # Звук (только при сбросе книги)
+        try:
+            self.sound_book_drop = ASSETS.sound(BOOK_DROP_SOUND)
+        except Exception:
+            self.sound_book_drop = None
+
+        self.setup_objects()
+
+    def setup_objects(self):
+        """Спрайты столов, шкафов и зон силы по расстановке симуляции"""
+        for x, y in self.sim.tables:
+            table = arcade.Sprite(self.table_texture, scale=TABLE_SCALE, center_x=x, center_y=y)
+            self.tables.append(table)
+            self.all_sprites.append(table)
+
+        for x, y in self.sim.bookshelves:
+            shelf = arcade.Sprite(self.bookshelf_texture, scale=BOOKSHELF_SCALE, center_x=x, center_y=y)
+            self.bookshelves.append(shelf)
+            self.object_list.append(shelf)
+
+        # Зона силы (ускоряет реген маны)
+        for x, y in self.sim.power_zones:
+            zone = arcade.Sprite(self.power_zone_texture, scale=POWER_ZONE_SCALE, center_x=x, center_y=y)
+            self.power_zone_list.append(zone)
+            self.object_list.append(zone)
+
+    def get_time_display(self):
+        """Форматирование времени для отображения"""
+        return self.sim.get_time_display()
+
+    def on_draw(self):
+        """Отрисовка всего: карты, игрока, HUD"""
+        profiler = self.profiler
+        with profiler.section("draw"):
+            sim = self.sim
+            self.clear()
+            bg_color = (10, 10, 30) if sim.is_night else (40, 40, 60)
+            arcade.set_background_color(bg_color)
+
+            # Отрисовка мира
+            with profiler.section("map"):
+                self.world_camera.use()
+                self.level.draw("walls behind")
+                self.level.draw("walls")
+                self.level.draw("objects")
+            with profiler.section("sprites"):
+                self.object_list.draw()
+                self.visitor_sprites.draw()
+                self.all_sprites.draw()
+                self.floating_books.draw()
+                self.level.draw("power_zones")
+                self.power_zone_list.draw()
+
+                # Подсветка целевого шкафа
+                if sim.quest_active and sim.target_bookshelf is not None:
+                    shelf = self.bookshelves[sim.target_bookshelf]
+                    pulse = math.sin(self.pulse_time * 6) * 0.3 + 0.7
+                    radius = 25 + 10 * pulse
+                    arcade.draw_circle_filled(
+                        shelf.center_x,
+                        shelf.center_y + 30,
+                        radius, (255, 255, 0, int(100 * pulse))
+                    )
+                    arcade.draw_circle_outline(
+                        shelf.center_x,
+                        shelf.center_y + 30,
+                        radius, arcade.color.YELLOW, 3
+                    )
+
+            # UI (HUD): перестраиваются только изменившиеся элементы
+            with profiler.section("hud"):
+                self.window.default_camera.use()
+                self.hud.update(sim, self.notification if self.notification_timer > 0 else None)
+                self.hud.draw()
+                if self.show_profiler:
+                    self.profiler_overlay.update()
+                    self.profiler_overlay.draw()
+
+    def on_update(self, delta_time: float):
+        """Ввод, физика и камера; игровые правила считает симуляция"""
+        profiler = self.profiler
+        profiler.begin_frame()
+        self.recorder.frame(delta_time)
+        with profiler.section("update"):
+            self.update_world(delta_time)
+
+    def update_world(self, delta_time):
+        sim = self.sim
+        profiler = self.profiler
+
+        # Автосохранение и результаты фоновой записи
+        if self.autosave:
+            self.autosave_timer += delta_time
+            if self.autosave_timer >= AUTOSAVE_INTERVAL:
+                self.autosave_timer = 0.0
+                self.save_game("autosave")
+        self.poll_saves()
+
+        # Таймер уведомлений
+        if self.notification_timer > 0:
+            self.notification_timer -= delta_time
+            if self.notification_timer <= 0:
+                self.notification = None
+
+        # Управление скоростью (спринт на SHIFT)
+        current_speed = SPEED * 2 if sim.is_sprinting else SPEED
+        if self.player.change_x != 0:
+            self.player.change_x = current_speed if self.player.change_x > 0 else -current_speed
+        if self.player.change_y != 0:
+            self.player.change_y = current_speed if self.player.change_y > 0 else -current_speed
+
+        # Физика и камера
+        with profiler.section("physics"):
+            self.physics_engine.update()
+        with profiler.section("camera"):
+            cam_x, cam_y = self.world_camera.position
+            target_x, target_y = self.player.center_x, self.player.center_y
+            new_x = arcade.math.lerp(cam_x, target_x, CAMERA_LERP)
+            new_y = arcade.math.lerp(cam_y, target_y, CAMERA_LERP)
+            half_w = self.world_camera.viewport_width / 2
+            half_h = self.world_camera.viewport_height / 2
+            new_x = max(half_w, min(self.map_width - half_w, new_x))
+            new_y = max(half_h, min(self.map_height - half_h, new_y))
+            self.world_camera.position = (new_x, new_y)
+            self.update_streaming()
+
+        # Игровые правила (фиксированный шаг)
+        with profiler.section("sim"):
+            sim.player_x, sim.player_y = self.player.center_x, self.player.center_y
+            sim.advance(delta_time)
+        for event in sim.pop_events():
+            if event == "book_drop" and self.sound_book_drop:
+                # Проигрываем звук только при сбросе книги
+                arcade.play_sound(self.sound_book_drop)
+
+        with profiler.section("sync"):
+            self.sync_sprites()
+        self.pulse_time += delta_time
+
+    def update_streaming(self):
+        """Подгрузить чанки карты под камеру и отдать физике стены рядом с игроком"""
+        self.level.update_for_camera(self.world_camera)
+        walls = self.level.collision_lists(self.player.center_x, self.player.center_y)
+        if walls != self.physics_engine.walls:
+            del self.physics_engine.walls
+            self.physics_engine.walls = walls
+
+    def sync_sprites(self):
+        """Привести спрайты посетителей и книг к состоянию симуляции"""
+        crowd = self.sim.crowd
+        while len(self.visitor_sprites) < len(crowd):
+            self.visitor_sprites.append(arcade.Sprite(self.visitor_texture, scale=VISITOR_SCALE))
+        while len(self.visitor_sprites) > len(crowd):
+            self.visitor_sprites.pop()
+        for sprite, x, y in zip(self.visitor_sprites, crowd.view("x").tolist(), crowd.view("y").tolist()):
+            sprite.position = (x, y)
+
+        for book in self.sim.books.values():
+            if book.id not in self.book_sprites:
+                sprite = arcade.Sprite(self.book_texture, scale=FLOATING_BOOK_SCALE,
+                                       center_x=book.x, center_y=book.y)
+                self.book_sprites[book.id] = sprite
+                self.floating_books.append(sprite)
+                self.object_list.append(sprite)  # Чтобы рисовалась вместе с объектами
+        for book_id in list(self.book_sprites):
+            if book_id not in self.sim.books:
+                self.book_sprites.pop(book_id).remove_from_sprite_lists()
+
+    def on_key_press(self, key, modifiers):
+        """Обработка нажатий клавиш"""
+        if key == arcade.key.F3:
+            self.show_profiler = not self.show_profiler
+            return
+        elif key == arcade.key.F4:
+            self.export_profile()
+            return
+        elif key == arcade.key.F10:
+            self.save_replay()
+            return
+        if key not in UNRECORDED_KEYS:
+            self.recorder.key("press", key, modifiers)
+
+        if key == arcade.key.W:
+            self.player.change_y = SPEED
+        elif key == arcade.key.S:
+            self.player.change_y = -SPEED
+        elif key == arcade.key.A:
+            self.player.change_x = -SPEED
+            self.player.texture = self.player_texture_left
+        elif key == arcade.key.D:
+            self.player.change_x = SPEED
+            self.player.texture = self.player_texture_right
+        elif key == arcade.key.LSHIFT or key == arcade.key.RSHIFT:
+            self.sim.is_sprinting = True
+        elif key == arcade.key.E:
+            self.handle_interaction()
+        elif key == arcade.key.T:
+            # Следующее ускорение времени: ×1 → ×10 → ×100 → ×1
+            scales = list(TIME_SCALES)
+            current = scales.index(self.sim.time_scale) if self.sim.time_scale in scales else -1
+            self.sim.time_scale = scales[(current + 1) % len(scales)]
+        elif key == arcade.key.ESCAPE:
+            pause = PauseView(self)
+            self.window.show_view(pause)
+
+    def on_key_release(self, key, modifiers):
+        """Обработка отпускания клавиш"""
+        if key not in UNRECORDED_KEYS:
+            self.recorder.key("release", key, modifiers)
+        if key in (arcade.key.W, arcade.key.S):
+            self.player.change_y = 0
+        if key in (arcade.key.A, arcade.key.D):
+            self.player.change_x = 0
+        if key in (arcade.key.LSHIFT, arcade.key.RSHIFT):
+            self.sim.is_sprinting = False
+
+    def handle_interaction(self):
+        """Сброс книги из шкафа (требует ману)"""
+        self.sim.player_x, self.sim.player_y = self.player.center_x, self.player.center_y
+        self.sim.interact()
+
+    def notify(self, text, duration=3.0):
+        self.notification = text
+        self.notification_timer = duration
+
+    def save_game(self, kind="manual"):
+        """Снимок мира в фоновую запись (см. saves.py)"""
+        self.sim.player_x, self.sim.player_y = self.player.center_x, self.player.center_y
+        self.pending_saves.append((SAVES.save(self.sim.snapshot(), kind), kind))
+
+    def poll_saves(self):
+        """Уведомить о завершённых записях; True, если уведомление изменилось"""
+        changed = False
+        for future, kind in [item for item in self.pending_saves if item[0].done()]:
+            self.pending_saves.remove((future, kind))
+            if future.exception() is not None:
+                self.notify("Ошибка сохранения!")
+                changed = True
+            elif kind == "manual":
+                self.notify("Игра сохранена!")
+                changed = True
+        return changed
+
+    def load_game(self, state, arrays):
+        """Восстановить мир из прочитанного сохранения"""
+        self.sim.restore(state, arrays)
+        self.player.center_x = self.sim.player_x
+        self.player.center_y = self.sim.player_y
+        self.world_camera.position = self.player.position
+        self.update_streaming()
+        self.sync_sprites()
+        # Запись ввода начинается с загруженного мира
+        self.recorder = InputRecorder(self.seed, start=(state, arrays))
+
+    def export_profile(self):
+        """Кольцевой буфер профайлера в CSV (F4)"""
+        path = self.profiler.export_csv(SAVE_FOLDER / f"profile_{time.strftime('%Y%m%d_%H%M%S')}.csv")
+        self.notify(f"Профиль: {path.name}")
+
+    def save_replay(self):
+        """Запись ввода сессии в папку replays (F10)"""
+        REPLAY_FOLDER.mkdir(exist_ok=True)
+        path = self.recorder.save(REPLAY_FOLDER / f"replay_{time.strftime('%Y%m%d_%H%M%S')}.json", self)
+        self.notify(f"Запись: {path.name}")
+
+
+# === ГЛАВНОЕ МЕНЮ ===
+class MainMenu(arcade.View):
+    def __init__(self):
+        super().__init__()
+        self.buttons = [
+            Button("Новая игра", SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2 + 80),
+            Button("Загрузить игру", SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2, color=arcade.color.DARK_BLUE),
+            Button("Выход", SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2 - 80, color=arcade.color.DARK_RED)
+        ]
+        # Анимированный фон (звёзды/пыль): одни и те же спрайты, новые позиции каждый кадр
+        self.stars = arcade.SpriteList()
+        for i in range(20):
+            self.stars.append(arcade.SpriteCircle(3, (100, 100, 150, 100)))
+        self.title_text = arcade.Text("FANTOM OF LIBRARY", SCREEN_WIDTH / 2, SCREEN_HEIGHT - 100,
+                                      arcade.color.WHITE, font_size=50, anchor_x="center")
+        self.subtitle_text = arcade.Text("Защитник знаний в вечной тишине...", SCREEN_WIDTH / 2, SCREEN_HEIGHT - 140,
+                                         arcade.color.GRAY, font_size=20, anchor_x="center")
+
+    def on_update(self, delta_time: float):
+        # Пока игрок в меню, понемногу кладём предзагруженные текстуры в атлас
+        ASSETS.upload_to_atlas()
+
+    def on_draw(self):
+        self.clear(arcade.color.DARK_BLUE)
+        for star in self.stars:
+            star.position = (random.randint(0, SCREEN_WIDTH), random.randint(0, SCREEN_HEIGHT))
+            star.scale = random.randint(1, 3) / 3
+        self.stars.draw()
+
+        self.title_text.draw()
+        self.subtitle_text.draw()
+
+        for button in self.buttons:
+            button.draw()
+
+    def on_mouse_press(self, x: float, y: float, button: int, modifiers: int):
+        for btn in self.buttons:
+            if btn.is_clicked(x, y):
+                if btn.text == "Новая игра":
+                    self.start(self.new_game)
+                elif btn.text == "Загрузить игру":
+                    self.window.show_view(LoadMenu(self))
+                elif btn.text == "Выход":
+                    arcade.exit()
+
+    def start(self, action):
+        """Выполнить action сразу или после экрана загрузки"""
+        if ASSETS.ready and not ASSETS.to_upload:
+            action()
+        else:
+            self.window.show_view(LoadingView(action))
+
+    def new_game(self):
+        self.window.show_view(GameView())
+
+
+# === МЕНЮ ЗАГРУЗКИ ===
+class LoadMenu(arcade.View):
+    """Список сохранений из каталога index.json (файлы сохранений не читаются)"""
+
+    MAX_ENTRIES = 6
+
+    def __init__(self, main_menu):
+        super().__init__()
+        self.main_menu = main_menu
+        self.status_text = arcade.Text("", SCREEN_WIDTH / 2, SCREEN_HEIGHT - 140, arcade.color.ORANGE,
+                                       font_size=16, anchor_x="center")
+        try:
+            self.entries = SAVES.list_saves()[:self.MAX_ENTRIES]
+        except OSError as error:
+            # Папка сохранений недоступна (или не записать index.json) — показываем причину
+            self.entries = []
+            self.status_text.text = f"Не удалось прочитать сохранения: {error}"
+        self.buttons = []
+        for i, meta in enumerate(self.entries):
+            kind = "Автосохранение" if meta["kind"] == "autosave" else "Сохранение"
+            label = f"{kind}: {format_game_time(meta['game_time'])} | Очки: {meta['score']}"
+            self.buttons.append(Button(label, SCREEN_WIDTH / 2, SCREEN_HEIGHT - 180 - i * 70,
+                                       width=700, height=56, color=arcade.color.DARK_BLUE))
+            self.buttons[-1].save_file = meta["file"]
+        self.back_button = Button("Назад", SCREEN_WIDTH / 2, 60, color=arcade.color.DARK_RED)
+        self.title_text = arcade.Text("Загрузить игру" if self.entries else "Сохранений нет",
+                                      SCREEN_WIDTH / 2, SCREEN_HEIGHT - 100,
+                                      arcade.color.WHITE, font_size=40, anchor_x="center")
+
+    def on_draw(self):
+        self.clear(arcade.color.DARK_BLUE)
+        self.title_text.draw()
+        self.status_text.draw()
+        for button in self.buttons:
+            button.draw()
+        self.back_button.draw()
+
+    def on_mouse_press(self, x: float, y: float, button: int, modifiers: int):
+        if self.back_button.is_clicked(x, y):
+            self.window.show_view(self.main_menu)
+            return
+        for btn in self.buttons:
+            if btn.is_clicked(x, y):
+                future = SAVES.load(btn.save_file)
+                self.window.show_view(LoadingView(lambda: self.open_save(future), wait_for=future))
+
+    def open_save(self, future):
+        try:
+            state, arrays, _ = future.result()
+            game = GameView()
+            game.load_game(state, arrays)     # SaveError, если схема снимка не та
+        except (SaveError, OSError) as error:
+            self.status_text.text = f"Не удалось загрузить сохранение: {error}"
+            self.window.show_view(self)
+            return
+        self.window.show_view(game)
+
+
+# === ЭКРАН ЗАГРУЗКИ ===
+class LoadingView(arcade.View):
+    """Ждёт фоновую предзагрузку ассетов и заполняет атлас, затем вызывает on_ready"""
+
+    def __init__(self, on_ready, wait_for=None):
+        super().__init__()
+        self.on_ready = on_ready
+        self.wait_for = wait_for          # Необязательный Future (например, чтение сохранения)
+        self.title_text = arcade.Text("Загрузка...", SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2 + 40,
+                                      arcade.color.WHITE, font_size=32, anchor_x="center")
+
+    def on_update(self, delta_time: float):
+        ASSETS.upload_to_atlas()
+        if ASSETS.ready and not ASSETS.to_upload and (self.wait_for is None or self.wait_for.done()):
+            self.on_ready()
+
+    def on_draw(self):
+        self.clear(arcade.color.DARK_BLUE)
+        self.title_text.draw()
+        bar_left, bar_bottom = SCREEN_WIDTH / 2 - 200, SCREEN_HEIGHT / 2 - 20
+        fill_width = ASSETS.progress * 400
+        if fill_width > 0:
+            arcade.draw_lrbt_rectangle_filled(bar_left, bar_left + fill_width, bar_bottom, bar_bottom + 20, arcade.color.GOLD)
+        arcade.draw_lrbt_rectangle_outline(bar_left, bar_left + 400, bar_bottom, bar_bottom + 20, arcade.color.WHITE, 2)
+
+
+# === ТОЧКА ВХОДА ===
+def main():
+    window = arcade.Window(SCREEN_WIDTH, SCREEN_HEIGHT, SCREEN_TITLE)
+    ASSETS.preload()  # Декодируем ассеты в фоне, пока показывается меню
+    main_menu = MainMenu()
+    window.show_view(main_menu)
+    arcade.run()
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
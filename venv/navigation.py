@@ -0,0 +1,111 @@
+"""Навигация посетителей по слою collision: кэшированные поля потоков.
+
+Для каждой точки назначения (стол, шкаф, вход) один раз считается поле
+потока — для каждой свободной клетки сетки направление на соседнюю клетку,
+ближайшую к цели (обход в ширину от цели). Поля хранятся одним массивом
+[поле × клетка, ось], поэтому следующий шаг любого числа посетителей — одна
+векторная выборка, без поиска пути на каждого посетителя и кадр. Кэш
+пересчитывается только при смене карты (set_grid).
+"""
+from collections import deque
+
+import numpy as np
+
+from constants import TILE_SIZE
+
+# Соседи клетки: (dx, dy); при равном расстоянии выигрывает более ранний
+NEIGHBOURS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+
+
+class FlowFieldNavigator:
+    """Поля потоков к точкам назначения на сетке проходимости"""
+
+    def __init__(self, blocked, tile_size=TILE_SIZE):
+        self.tile_size = tile_size
+        self.destinations = []            # id поля -> клетка цели (cx, cy)
+        self.by_cell = {}                 # клетка цели -> id поля
+        self.set_grid(blocked)
+
+    def set_grid(self, blocked):
+        """Новая сетка (строка 0 — верх карты); все поля пересчитываются"""
+        self.blocked = np.asarray(blocked, dtype=bool)[::-1]    # Строка 0 — низ, как ось y
+        self.rows, self.columns = self.blocked.shape
+        self.flow = np.zeros((len(self.destinations) * self.blocked.size, 2))
+        self.goal_index = np.full(len(self.destinations), -1, dtype=np.intp)
+        self._flow_rows = None
+        for field, cell in enumerate(self.destinations):
+            self._build(field, cell)
+
+    def cell(self, x, y):
+        cx = min(max(int(x // self.tile_size), 0), self.columns - 1)
+        cy = min(max(int(y // self.tile_size), 0), self.rows - 1)
+        return cx, cy
+
+    def destination(self, x, y):
+        """id поля потока к точке (x, y); считается при первом запросе клетки"""
+        cell = self.cell(x, y)
+        field = self.by_cell.get(cell)
+        if field is None:
+            field = len(self.destinations)
+            self.destinations.append(cell)
+            self.by_cell[cell] = field
+            self.flow = np.vstack([self.flow, np.zeros((self.blocked.size, 2))])
+            self.goal_index = np.append(self.goal_index, -1)
+            self._flow_rows = None
+            self._build(field, cell)
+        return field
+
+    def _goal_cell(self, cell):
+        """Сама клетка цели или ближайшая к ней свободная (если цель в стене)"""
+        cx, cy = cell
+        if not self.blocked[cy, cx]:
+            return cell
+        free_y, free_x = np.nonzero(~self.blocked)
+        if not len(free_x):
+            return None
+        i = int(np.argmin(np.abs(free_x - cx) + np.abs(free_y - cy)))
+        return int(free_x[i]), int(free_y[i])
+
+    def _build(self, field, cell):
+        """Обход в ширину от цели и направление на лучшего соседа для каждой клетки"""
+        rows, columns, blocked = self.rows, self.columns, self.blocked
+        dist = np.full((rows, columns), np.inf)
+        goal = self._goal_cell(cell)
+        if goal is not None:
+            self.goal_index[field] = goal[1] * columns + goal[0]
+            queue = deque([goal])
+            dist[goal[1], goal[0]] = 0
+            while queue:
+                cx, cy = queue.popleft()
+                d = dist[cy, cx] + 1
+                for dx, dy in NEIGHBOURS:
+                    nx, ny = cx + dx, cy + dy
+                    if 0 <= nx < columns and 0 <= ny < rows and not blocked[ny, nx] and dist[ny, nx] > d:
+                        dist[ny, nx] = d
+                        queue.append((nx, ny))
+
+        # Расстояния соседей каждой клетки (за краем карты — бесконечность)
+        padded = np.pad(dist, 1, constant_values=np.inf)
+        neighbour_dist = np.stack([padded[1 + dy:1 + dy + rows, 1 + dx:1 + dx + columns]
+                                   for dx, dy in NEIGHBOURS])
+        best = np.argmin(neighbour_dist, axis=0)
+        # Нулевой вектор — «иди прямо к точке»: клетка цели, стены и недостижимые клетки
+        step = np.isfinite(dist) & (dist > 0)
+        directions = np.array(NEIGHBOURS, dtype=np.float64)[best] * step[..., None]
+        size = self.blocked.size
+        self.flow[field * size:(field + 1) * size] = directions.reshape(size, 2)
+
+    def direction(self, field, x, y):
+        """Направление следующего шага (dx, dy) одного посетителя — без вызовов NumPy"""
+        if self._flow_rows is None:
+            self._flow_rows = [tuple(row) for row in self.flow.tolist()]
+        cx = min(max(int(x // self.tile_size), 0), self.columns - 1)
+        cy = min(max(int(y // self.tile_size), 0), self.rows - 1)
+        return self._flow_rows[field * self.blocked.size + cy * self.columns + cx]
+
+    def cell_index(self, x, y):
+        """Номера клеток (cy × columns + cx) для массивов позиций"""
+        # np.minimum/np.maximum заметно дешевле np.clip на коротких массивах
+        cx = np.minimum(np.maximum((x // self.tile_size).astype(np.intp), 0), self.columns - 1)
+        cy = np.minimum(np.maximum((y // self.tile_size).astype(np.intp), 0), self.rows - 1)
+        return cy * self.columns + cx
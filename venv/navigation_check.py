@@ -0,0 +1,83 @@
+"""Проверка полей потоков на синтетической карте с несколькими проходами.
+
+Сетка — ряды стеллажей с проходом попеременно сверху и снизу (змейка).
+Посетители из случайных свободных клеток идут к случайным целям; на каждом
+шаге проверяется, что никто не зашёл в занятую клетку, а в конце — что
+дошли все. Толпа прогоняется дважды: скалярным шагом и векторным.
+
+    python navigation_check.py --seeds 20
+"""
+import argparse
+import random
+
+import numpy as np
+
+from constants import SIM_FIXED_DT
+from crowd import VisitorCrowd, SCALAR_CROWD
+from navigation import FlowFieldNavigator
+
+TILE = 64
+MAX_SECONDS = 120.0
+
+
+def aisle_grid(rows=12, columns=21, aisles=5):
+    """Маска стен (строка 0 — верх): рамка и стеллажи с проходом у края"""
+    blocked = np.zeros((rows, columns), dtype=bool)
+    blocked[[0, -1], :] = True
+    blocked[:, [0, -1]] = True
+    step = (columns - 1) // (aisles + 1)
+    for i in range(aisles):
+        column = step * (i + 1)
+        if i % 2:
+            blocked[2:-1, column] = True      # Проход сверху
+        else:
+            blocked[1:-2, column] = True      # Проход снизу
+    return blocked
+
+
+def free_point(rng, blocked_bottom_up):
+    """Центр случайной свободной клетки в координатах мира"""
+    free_y, free_x = np.nonzero(~blocked_bottom_up)
+    i = rng.randrange(len(free_x))
+    return (free_x[i] + 0.5) * TILE, (free_y[i] + 0.5) * TILE
+
+
+def check(seed, visitors):
+    """Прогон одной толпы; число шагов до прибытия всех"""
+    rng = random.Random(seed)
+    blocked = aisle_grid()
+    navigator = FlowFieldNavigator(blocked, TILE)
+    walls = navigator.blocked                  # Строка 0 — низ, как ось y
+    crowd = VisitorCrowd()
+    for _ in range(visitors):
+        x, y = free_point(rng, walls)
+        # Старт не в центре клетки — чтобы проверить и повороты у стен
+        x += rng.uniform(-0.4, 0.4) * TILE
+        y += rng.uniform(-0.4, 0.4) * TILE
+        target_x, target_y = free_point(rng, walls)
+        crowd.spawn(x, y, target_x, target_y, navigator.destination(target_x, target_y), 0, 0.0)
+
+    arrived = np.zeros(visitors, dtype=bool)
+    for step in range(int(MAX_SECONDS / SIM_FIXED_DT)):
+        arrived[crowd.move(SIM_FIXED_DT, navigator)] = True
+        cx = (crowd.view("x") // TILE).astype(int)
+        cy = (crowd.view("y") // TILE).astype(int)
+        inside = walls[cy, cx]
+        assert not inside.any(), f"сид {seed}: посетители {np.flatnonzero(inside).tolist()} в стене"
+        if arrived.all():
+            return step + 1
+    raise AssertionError(f"сид {seed}: не дошли {np.flatnonzero(~arrived).tolist()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Проверка навигации на карте с проходами")
+    parser.add_argument("--seeds", type=int, default=20)
+    args = parser.parse_args()
+    for visitors in (SCALAR_CROWD, SCALAR_CROWD * 8):
+        steps = [check(seed, visitors) for seed in range(args.seeds)]
+        print(f"{visitors} посетителей, {args.seeds} сидов: все дошли, в стены не заходили "
+              f"(до {max(steps)} шагов)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Покадровый профайлер: время секций кадра в кольцевом буфере.
+
+    with profiler.section("physics"):
+        self.physics_engine.update()
+
+Каждая секция хранит время за последние capacity кадров (NumPy-кольцо),
+поэтому средние и перцентили считаются без роста памяти, а export_csv()
+выгружает весь буфер для сравнения прогонов.
+"""
+import csv
+import time
+
+import numpy as np
+
+PROFILE_FRAMES = 600                  # Кадров в кольцевом буфере (10 с при 60 FPS)
+
+
+class _Section:
+    """Замер одной секции в блоке with (объект переиспользуется)"""
+
+    __slots__ = ("profiler", "samples", "start")
+
+    def __init__(self, profiler, samples):
+        self.profiler = profiler
+        self.samples = samples
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.samples[self.profiler.slot] += time.perf_counter() - self.start
+
+
+class FrameProfiler:
+    """Время секций по кадрам; повторный вход в секцию за кадр суммируется"""
+
+    def __init__(self, capacity=PROFILE_FRAMES):
+        self.capacity = capacity
+        self.samples = {}                 # Секция -> секунд по кадрам кольца
+        self.sections = {}                # Секция -> _Section
+        self.frames = 0                   # Начато кадров всего
+        self.slot = 0
+
+    def begin_frame(self):
+        """Начать кадр: его слот в кольце обнуляется"""
+        self.slot = self.frames % self.capacity
+        self.frames += 1
+        for samples in self.samples.values():
+            samples[self.slot] = 0.0
+
+    def section(self, name):
+        section = self.sections.get(name)
+        if section is None:
+            self.samples[name] = np.zeros(self.capacity)
+            section = self.sections[name] = _Section(self, self.samples[name])
+        return section
+
+    def _recent(self, name):
+        """Замеры секции в хронологическом порядке (только заполненная часть кольца)"""
+        samples = self.samples[name]
+        if self.frames <= self.capacity:
+            return samples[:self.frames]
+        start = self.frames % self.capacity
+        return np.concatenate([samples[start:], samples[:start]])
+
+    def stats(self, name, percentiles=(50, 95, 99)):
+        """Среднее и перцентили секции в миллисекундах"""
+        values = self._recent(name) * 1000
+        result = {"mean": float(values.mean()) if len(values) else 0.0}
+        for p, value in zip(percentiles, np.percentile(values, percentiles) if len(values) else
+                            [0.0] * len(percentiles)):
+            result[f"p{p}"] = float(value)
+        return result
+
+    def report(self):
+        """Строки «секция: среднее / p95» от самых дорогих секций"""
+        rows = sorted(((name, self.stats(name)) for name in self.samples),
+                      key=lambda item: item[1]["mean"], reverse=True)
+        return [f"{name:<10} {s['mean']:6.2f} мс  p95 {s['p95']:6.2f}" for name, s in rows]
+
+    def export_csv(self, path):
+        """Буфер в CSV: кадр и время каждой секции в миллисекундах"""
+        names = list(self.samples)
+        columns = [self._recent(name) * 1000 for name in names]
+        first = max(0, self.frames - self.capacity)
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["frame"] + names)
+            for i, row in enumerate(zip(*columns)):
+                writer.writerow([first + i] + [f"{value:.4f}" for value in row])
+        return path
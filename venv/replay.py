@@ -0,0 +1,155 @@
+"""Запись ввода и детерминированный повтор сессий — набор замеров производительности.
+
+Игра записывает сид симуляции, delta_time каждого кадра и нажатия клавиш
+(on_key_press/on_key_release); F10 сохраняет запись в папку replays.
+Повтор в скрытом окне выполняет те же кадры с теми же событиями, сверяет
+итог с записанным и печатает p50/p95/p99 времени обновления и отрисовки:
+
+    python replay.py ~/Documents/FantomOfLibrary/replays/*.json
+"""
+import argparse
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+
+from saves import write_atomic
+
+REPLAY_VERSION = 1
+PERCENTILES = (50, 95, 99)
+
+
+def session_digest(view):
+    """Итог сессии для сверки повтора с записью"""
+    sim = view.sim
+    return {
+        "game_time": round(sim.game_time, 6),
+        "score": sim.score,
+        "visitors_helped": sim.visitors_helped,
+        "mana": round(sim.mana, 6),
+        "player": [round(view.player.center_x, 3), round(view.player.center_y, 3)],
+    }
+
+
+def _encode_start(snapshot):
+    state, arrays = snapshot
+    return {"state": state, "arrays": {name: [values.dtype.str, values.tolist()]
+                                       for name, values in arrays.items()}}
+
+
+def _decode_start(data):
+    arrays = {name: np.array(values, dtype=np.dtype(dtype)) for name, (dtype, values) in data["arrays"].items()}
+    return data["state"], arrays
+
+
+class InputRecorder:
+    """Сид, кадры и события клавиатуры одной игровой сессии"""
+
+    def __init__(self, seed, start=None):
+        self.seed = seed
+        self.start = start                # Снимок мира, если сессия начата с сохранения
+        self.frames = []                  # delta_time каждого on_update
+        self.events = []                  # [кадр, "press"/"release", клавиша, модификаторы]
+
+    def frame(self, delta_time):
+        self.frames.append(delta_time)
+
+    def key(self, kind, key, modifiers):
+        """Событие относится к кадру, который будет обновлён следующим"""
+        self.events.append([len(self.frames), kind, key, modifiers])
+
+    def save(self, path, view):
+        data = {
+            "version": REPLAY_VERSION,
+            "seed": self.seed,
+            "start": _encode_start(self.start) if self.start else None,
+            "frames": self.frames,
+            "events": self.events,
+            "final": session_digest(view),
+        }
+        write_atomic(path, json.dumps(data, separators=(",", ":")).encode("utf-8"))
+        return path
+
+
+def load_recording(path):
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if data.get("version", 0) > REPLAY_VERSION:
+        raise ValueError(f"{path}: версия записи {data['version']} новее поддерживаемой")
+    if data["start"]:
+        data["start"] = _decode_start(data["start"])
+    return data
+
+
+def replay(recording, window):
+    """Выполнить запись в окне; времена кадров и совпадение итога"""
+    from main import GameView
+
+    view = GameView(seed=recording["seed"], autosave=False)
+    if recording["start"]:
+        view.load_game(*recording["start"])
+    window.show_view(view)
+
+    events = recording["events"]
+    next_event = 0
+    update_times, draw_times = [], []
+    for frame, delta_time in enumerate(recording["frames"]):
+        while next_event < len(events) and events[next_event][0] == frame:
+            _, kind, key, modifiers = events[next_event]
+            if kind == "press":
+                view.on_key_press(key, modifiers)
+            else:
+                view.on_key_release(key, modifiers)
+            next_event += 1
+        start = time.perf_counter()
+        view.on_update(delta_time)
+        update_times.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        view.on_draw()
+        window.ctx.finish()
+        draw_times.append(time.perf_counter() - start)
+
+    def stats(times):
+        values = np.array(times) * 1000
+        return dict(zip((f"p{p}" for p in PERCENTILES), np.percentile(values, PERCENTILES).tolist()))
+
+    return {
+        "frames": len(update_times),
+        "update": stats(update_times),
+        "draw": stats(draw_times),
+        "matches": session_digest(view) == recording["final"],
+        "view": view,
+    }
+
+
+def main():
+    import arcade
+    from constants import SCREEN_WIDTH, SCREEN_HEIGHT
+    from assets import ASSETS
+
+    parser = argparse.ArgumentParser(description="Повтор записанных сессий с замером кадра")
+    parser.add_argument("recordings", nargs="+", type=Path)
+    parser.add_argument("--csv", type=Path, help="папка для CSV профайлера каждого повтора")
+    args = parser.parse_args()
+
+    window = arcade.Window(SCREEN_WIDTH, SCREEN_HEIGHT, "Replay benchmark", visible=False)
+    ASSETS.preload()
+    diverged = 0
+    for path in args.recordings:
+        result = replay(load_recording(path), window)
+        update, draw = result["update"], result["draw"]
+        print(f"{path.name}: {result['frames']} кадров | "
+              f"update p50 {update['p50']:.3f} p95 {update['p95']:.3f} p99 {update['p99']:.3f} мс | "
+              f"draw p50 {draw['p50']:.3f} p95 {draw['p95']:.3f} p99 {draw['p99']:.3f} мс"
+              + ("" if result["matches"] else " | ИТОГ РАСХОДИТСЯ С ЗАПИСЬЮ"))
+        diverged += not result["matches"]
+        if args.csv:
+            args.csv.mkdir(parents=True, exist_ok=True)
+            result["view"].profiler.export_csv(args.csv / f"{path.stem}.csv")
+    window.close()
+    raise SystemExit(1 if diverged else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""Сохранения: версионированный бинарный снимок мира, фоновая запись, каталог.
+
+Формат файла .fols:
+    заголовок  struct "<4sHHII": сигнатура, версия, флаги, длина meta, длина тела
+    meta       JSON-сводка для меню (вид, дата, очки, игровое время)
+    тело       [zlib] struct "<I" длина JSON + JSON состояния + сырые байты массивов
+
+Снимок снимается в игровом потоке (копии массивов), кодируется и пишется в
+рабочем потоке: временный файл → fsync → os.replace. Каталог index.json
+хранит сводки всех сохранений, меню читает только его.
+"""
+import json
+import os
+import struct
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+SAVE_MAGIC = b"FOLS"
+SAVE_VERSION = 1                      # Поднимать при любой смене схемы snapshot() — вместе с миграцией
+SAVE_EXT = ".fols"
+FLAG_ZLIB = 1
+HEADER = struct.Struct("<4sHHII")
+INDEX_NAME = "index.json"
+
+AUTOSAVE_SLOTS = 3                    # Кольцо автосохранений
+AUTOSAVE_INTERVAL = 60.0              # Секунд игры между автосохранениями
+
+
+class SaveError(Exception):
+    """Файл сохранения повреждён или несовместим"""
+
+
+# === КОДИРОВАНИЕ ===
+def encode_save(state, arrays, meta, compress=True):
+    """Байты файла сохранения из снимка LibrarySimulation.snapshot()"""
+    blobs, layout, offset = [], {}, 0
+    for name, values in arrays.items():
+        data = np.ascontiguousarray(values).tobytes()
+        layout[name] = [values.dtype.str, len(values), offset]
+        blobs.append(data)
+        offset += len(data)
+    state_json = json.dumps({"state": state, "arrays": layout}, separators=(",", ":")).encode("utf-8")
+    body = struct.pack("<I", len(state_json)) + state_json + b"".join(blobs)
+    flags = 0
+    if compress:
+        body = zlib.compress(body, 1)
+        flags |= FLAG_ZLIB
+    meta_json = json.dumps(meta, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return HEADER.pack(SAVE_MAGIC, SAVE_VERSION, flags, len(meta_json), len(body)) + meta_json + body
+
+
+def _read_header(f):
+    raw = f.read(HEADER.size)
+    if len(raw) < HEADER.size:
+        raise SaveError("файл обрезан")
+    magic, version, flags, meta_len, body_len = HEADER.unpack(raw)
+    if magic != SAVE_MAGIC:
+        raise SaveError("не файл сохранения")
+    if version > SAVE_VERSION:
+        raise SaveError(f"версия {version} новее игры ({SAVE_VERSION})")
+    return flags, meta_len, body_len
+
+
+def read_meta(path):
+    """Только сводка из заголовка — без чтения тела"""
+    with open(path, "rb") as f:
+        _, meta_len, _ = _read_header(f)
+        return json.loads(f.read(meta_len).decode("utf-8"))
+
+
+def decode_save(path):
+    """(state, arrays, meta) из файла сохранения"""
+    with open(path, "rb") as f:
+        flags, meta_len, body_len = _read_header(f)
+        meta = json.loads(f.read(meta_len).decode("utf-8"))
+        body = f.read(body_len)
+    if len(body) != body_len:
+        raise SaveError("файл обрезан")
+    try:
+        if flags & FLAG_ZLIB:
+            body = zlib.decompress(body)
+        (state_len,) = struct.unpack_from("<I", body)
+        payload = json.loads(body[4:4 + state_len].decode("utf-8"))
+        blob = memoryview(body)[4 + state_len:]
+        arrays = {}
+        for name, (dtype, count, offset) in payload["arrays"].items():
+            arrays[name] = np.frombuffer(blob, dtype=np.dtype(dtype), count=count, offset=offset).copy()
+        return payload["state"], arrays, meta
+    except (zlib.error, struct.error, ValueError, KeyError, TypeError) as error:
+        raise SaveError(f"файл повреждён ({error})") from error
+
+
+def write_atomic(path, data):
+    """Записать файл целиком или не трогать прежний (временный файл + rename)"""
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+# === ХРАНИЛИЩЕ ===
+class SaveStore:
+    """Папка сохранений: фоновая запись/чтение, кольцо автосохранений и каталог"""
+
+    def __init__(self, folder, compress=True):
+        self.folder = folder
+        self.compress = compress
+        self.index_path = folder / INDEX_NAME
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="saves")
+        self.lock = threading.Lock()
+        self.entries = None               # Кэш каталога: имя файла -> сводка
+        self.autosave_counter = None      # Номер следующего слота автосохранения
+
+    # --- Запись ---
+    def save(self, snapshot, kind="manual"):
+        """Поставить снимок в очередь на запись; Future с именем файла"""
+        if kind == "autosave":
+            if self.autosave_counter is None:
+                self.autosave_counter = self._oldest_autosave_slot()
+            filename = f"autosave_{self.autosave_counter % AUTOSAVE_SLOTS}{SAVE_EXT}"
+            self.autosave_counter += 1
+        else:
+            now = time.time()
+            filename = f"save_{time.strftime('%Y%m%d_%H%M%S', time.localtime(now))}_{int(now * 1000) % 1000:03d}{SAVE_EXT}"
+        return self.executor.submit(self._write, filename, kind, snapshot)
+
+    def _write(self, filename, kind, snapshot):
+        state, arrays = snapshot
+        meta = {
+            "file": filename,
+            "kind": kind,
+            "created": time.time(),
+            "game_time": state["game_time"],
+            "score": state["score"],
+            "visitors_helped": state["visitors_helped"],
+        }
+        write_atomic(self.folder / filename, encode_save(state, arrays, meta, self.compress))
+        with self.lock:
+            entries = self._entries()
+            entries[filename] = meta
+            self._write_index(entries)
+        return filename
+
+    def _oldest_autosave_slot(self):
+        """Слот, который перезаписывать первым: пустой или самый старый"""
+        with self.lock:
+            entries = self._entries()
+
+        def created(slot):
+            meta = entries.get(f"autosave_{slot}{SAVE_EXT}")
+            return meta["created"] if meta else -1.0
+        return min(range(AUTOSAVE_SLOTS), key=created)
+
+    # --- Чтение ---
+    def load(self, filename):
+        """Фоновое чтение сохранения; Future с (state, arrays, meta)"""
+        return self.executor.submit(decode_save, self.folder / filename)
+
+    def list_saves(self):
+        """Сводки сохранений из каталога, новые сверху"""
+        with self.lock:
+            entries = list(self._entries().values())
+        return sorted(entries, key=lambda meta: meta["created"], reverse=True)
+
+    # --- Каталог ---
+    def _entries(self):
+        if self.entries is None:
+            try:
+                with open(self.index_path, encoding="utf-8") as f:
+                    self.entries = {meta["file"]: meta for meta in json.load(f)["saves"]}
+            except (OSError, ValueError, KeyError):
+                self.entries = self._rebuild_index()
+            # Файлы, удалённые вручную, из каталога убираем
+            self.entries = {name: meta for name, meta in self.entries.items()
+                            if (self.folder / name).exists()}
+        return self.entries
+
+    def _rebuild_index(self):
+        """Каталог по заголовкам файлов (если index.json потерян или испорчен)"""
+        entries = {}
+        for path in self.folder.glob(f"*{SAVE_EXT}"):
+            try:
+                meta = read_meta(path)
+            except (OSError, ValueError, SaveError):
+                continue
+            meta["file"] = path.name
+            entries[path.name] = meta
+        self._write_index(entries)
+        return entries
+
+    def _write_index(self, entries):
+        data = json.dumps({"version": SAVE_VERSION, "saves": list(entries.values())},
+                          separators=(",", ":"), ensure_ascii=False)
+        write_atomic(self.index_path, data.encode("utf-8"))
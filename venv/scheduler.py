@@ -0,0 +1,37 @@
+"""Очередь отложенных событий по игровому времени (heapq).
+
+Вместо таймеров, которые уменьшаются каждый кадр, событие кладётся в кучу
+с абсолютным временем срабатывания. За шаг извлекаются только наступившие
+события, поэтому работа кадра пропорциональна их числу, а не числу
+ожидающих таймеров. Отменённые или устаревшие события не удаляются из
+кучи — их отбрасывает обработчик, сверив с текущим состоянием.
+"""
+import heapq
+
+
+class EventScheduler:
+    """Куча событий (время, порядковый номер, вид, данные)"""
+
+    def __init__(self):
+        self.queue = []
+        self.counter = 0                  # При равном времени — в порядке добавления
+
+    def __len__(self):
+        return len(self.queue)
+
+    def schedule(self, when, kind, payload=None):
+        heapq.heappush(self.queue, (when, self.counter, kind, payload))
+        self.counter += 1
+
+    @property
+    def next_time(self):
+        """Время ближайшего события (inf, если очередь пуста)"""
+        return self.queue[0][0] if self.queue else float('inf')
+
+    def pop(self):
+        """Извлечь ближайшее событие: (время, вид, данные)"""
+        when, _, kind, payload = heapq.heappop(self.queue)
+        return when, kind, payload
+
+    def clear(self):
+        self.queue.clear()
@@ -0,0 +1,695 @@
+"""Headless-ядро игровой логики и пакетный прогон для балансировки.
+
+Все правила игры (часы дня/ночи, мана, посетители, задания) живут здесь
+и не зависят от arcade, окна и реального времени. GameView только передаёт
+позицию игрока и рисует состояние симуляции.
+
+Пакетный прогон:  python simulation.py --runs 2000 --days 7
+"""
+import argparse
+import math
+import os
+import random
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from constants import (
+    SPEED, POWER_ZONE_SIZE, INTERACTION_DISTANCE, MANA_COST_INTERACTION, DAY_DURATION,
+    TABLE_SCALE, BOOKSHELF_SCALE, TABLE_TEXTURE_SIZE, BOOKSHELF_TEXTURE_SIZE,
+    MAP_NAME, TILE_SIZE, SIM_FIXED_DT, SPRINT_MANA_COST, POWER_ZONE_REGEN_MULT,
+    VISITOR_Y, VISITOR_ENTRANCE_X, VISITOR_EXIT_X,
+    VISITOR_POST_WAIT, BOOK_REWARD, FLOATING_BOOK_Y,
+    FIRST_SPAWN_DELAY, RESPAWN_DELAY, QUEST_DELAY,
+)
+from spatial import SpatialHash
+from navigation import FlowFieldNavigator
+from tmx import COLLISION_LAYER, read_layer_grid
+from scheduler import EventScheduler
+from saves import SaveError
+from crowd import (
+    VisitorCrowd, ARRIVING, WAITING, GOING_TO_BOOK, RETURNING_TO_TABLE,
+    POST_INTERACTION_WAIT, LEAVING,
+)
+
+DAY_NAMES = ["Пн", "Вт", "Ср", "Чт", "Пт", "Сб", "Вс"]
+
+
+def read_map_size(map_name=MAP_NAME):
+    """Размер карты в пикселях по заголовку .tmx (без загрузки тайлов)"""
+    root = ET.parse(map_name).getroot()
+    width = int(root.get("width")) * int(root.get("tilewidth"))
+    height = int(root.get("height")) * int(root.get("tileheight"))
+    return width, height
+
+
+def format_game_time(game_time, day_duration=DAY_DURATION):
+    """«Пн 05:00 | День» по игровому времени"""
+    total_seconds = int(game_time)
+    days = total_seconds // int(day_duration)
+    seconds_in_day = total_seconds % int(day_duration)
+    hours = seconds_in_day // 5
+    period = "Ночь" if (game_time % day_duration) / day_duration > 0.5 else "День"
+    return f"{DAY_NAMES[days % 7]} {hours:02d}:00 | {period}"
+
+
+def build_layout(map_width):
+    """Центры столов, шкафов и зон силы — общая расстановка для игры и симуляции"""
+    margin = 150
+    usable_width = map_width - 2 * margin
+    table_w = TABLE_TEXTURE_SIZE[0] * TABLE_SCALE
+    table_h = TABLE_TEXTURE_SIZE[1] * TABLE_SCALE
+    shelf_w = BOOKSHELF_TEXTURE_SIZE[0] * BOOKSHELF_SCALE
+    shelf_h = BOOKSHELF_TEXTURE_SIZE[1] * BOOKSHELF_SCALE
+
+    def lefts(count):
+        if count == 1:
+            return [map_width / 2]
+        return [margin + i * (usable_width / (count - 1)) for i in range(count)]
+
+    return {
+        "tables": [(x + table_w / 2, 70 + table_h / 2) for x in lefts(4)],
+        "bookshelves": [(x + shelf_w / 2, 68 + shelf_h / 2) for x in lefts(5)],
+        "power_zones": [(map_width - 300, 130)],
+    }
+
+
+# === СУЩНОСТИ ===
+class Book:
+    def __init__(self, book_id, x, y, owner=None):
+        self.id = book_id
+        self.x = x
+        self.y = y
+        self.owner = owner                # id посетителя, для которого сброшена книга
+
+
+# === СИМУЛЯЦИЯ ===
+class LibrarySimulation:
+    """Состояние мира и правила игры с фиксированным шагом времени"""
+
+    # Скалярные поля, входящие в снимок состояния (параметры баланса тоже)
+    SNAPSHOT_FIELDS = (
+        "day_duration", "mana_cost_interaction", "first_spawn_delay", "respawn_delay",
+        "quest_delay_range", "max_visitors", "spawn_interval",
+        "player_x", "player_y", "is_sprinting",
+        "game_time", "is_night", "mana", "max_mana", "mana_regen_rate", "score", "visitors_helped",
+        "quest_active", "target_bookshelf", "quest_owner",
+        "current_day", "spawn_due", "quest_clock", "next_id", "accumulator",
+    )
+
+    def __init__(self, map_width, map_height, seed=None, overrides=None, collision=None, tile_size=TILE_SIZE):
+        self.map_width = map_width
+        self.map_height = map_height
+        self.rng = random.Random(seed)
+
+        # Параметры баланса (можно переопределить для пакетного прогона)
+        self.day_duration = DAY_DURATION
+        self.mana_cost_interaction = MANA_COST_INTERACTION
+        self.first_spawn_delay = FIRST_SPAWN_DELAY
+        self.respawn_delay = RESPAWN_DELAY
+        self.quest_delay_range = QUEST_DELAY
+        self.max_visitors = 1             # Одновременно в библиотеке
+        self.spawn_interval = RESPAWN_DELAY   # Пауза между спавнами, пока есть места
+        self.time_scale = 1.0             # Ускорение игрового времени в advance() (×10, ×100)
+        for name, value in (overrides or {}).items():
+            if not hasattr(self, name):
+                raise AttributeError(f"Неизвестный параметр баланса: {name}")
+            setattr(self, name, value)
+
+        layout = build_layout(map_width)
+        self.tables = layout["tables"]
+        self.bookshelves = layout["bookshelves"]
+        self.power_zones = layout["power_zones"]
+
+        # Пространственные индексы для запросов близости
+        self.shelf_index = SpatialHash()
+        for i, (x, y) in enumerate(self.bookshelves):
+            self.shelf_index.insert(i, x, y)
+        self.zone_index = SpatialHash()
+        for i, (x, y) in enumerate(self.power_zones):
+            self.zone_index.insert(i, x, y)
+        self.book_index = SpatialHash()   # Сброшенные книги: вставка при сбросе, удаление при взятии
+        self._zone_position = None        # Позиция игрока последней проверки зоны силы
+        self._in_zone = False
+        self.table_xs = np.array([x for x, _ in self.tables], dtype=np.float64)
+
+        # Навигация по слою collision: поля потоков к столам, шкафам и двери
+        if collision is None:
+            collision = read_layer_grid(MAP_NAME, COLLISION_LAYER)
+        if collision is None:
+            collision = np.zeros((int(map_height // tile_size), int(map_width // tile_size)), dtype=bool)
+        self.navigator = FlowFieldNavigator(collision, tile_size)
+        self.table_fields = np.array([self.navigator.destination(x, VISITOR_Y) for x in self.table_xs.tolist()],
+                                     dtype=np.int32)
+        for x, _ in self.bookshelves:
+            self.navigator.destination(x, VISITOR_Y)
+        self.exit_field = self.navigator.destination(VISITOR_EXIT_X, VISITOR_Y)
+
+        # Игрок (позицию задаёт GameView или бот)
+        self.player_x = 0.0
+        self.player_y = 0.0
+        self.is_sprinting = False
+
+        # Игровые переменные
+        self.game_time = 0.0
+        self.is_night = False
+        self.mana = 100.0
+        self.max_mana = 100.0
+        self.mana_regen_rate = 1.0
+        self.score = 0
+        self.visitors_helped = 0
+
+        # Квест и посетители
+        self.quest_active = False
+        self.target_bookshelf = None      # Индекс в self.bookshelves
+        self.quest_owner = None           # id посетителя, для которого задание
+        self.crowd = VisitorCrowd()
+        self.books = {}                   # id -> Book
+        self.owner_books = {}             # id посетителя -> его Book
+
+        # Отложенные события: по игровому времени (день/ночь, спавн, конец ожидания)
+        # и по «часам заданий», которые идут, пока нет книг и активного задания
+        self.timeline = EventScheduler()
+        self.quest_events = EventScheduler()
+        self.quest_clock = 0.0
+
+        # Система посетителей
+        self.current_day = 0
+        self.spawn_due = None             # Время следующего спавна (None — ждём ухода)
+        self.schedule_spawn(self.rng.uniform(*self.first_spawn_delay))
+        self.schedule_day_night()
+
+        self.next_id = 0
+        self.accumulator = 0.0
+        self.events = []                  # События для представления ("book_drop", ...)
+
+    def _new_id(self):
+        self.next_id += 1
+        return self.next_id
+
+    # --- Время ---
+    def advance(self, delta_time):
+        """Продвинуть симуляцию на delta_time × time_scale фиксированными шагами; число шагов
+
+        Пока в мире ничего не движется, шаги до ближайшего события не считаются
+        по одному, а пропускаются разом (skip), поэтому ускорение ×100 ночью
+        стоит столько же, сколько ×1.
+        """
+        self.accumulator += delta_time * self.time_scale
+        steps = 0
+        while self.accumulator >= SIM_FIXED_DT:
+            count = self.idle_steps(int(self.accumulator / SIM_FIXED_DT))
+            if count > 1:
+                self.skip(count)
+            else:
+                count = 1
+                self.step(SIM_FIXED_DT)
+            self.accumulator -= count * SIM_FIXED_DT
+            steps += count
+        return steps
+
+    def idle_steps(self, limit):
+        """Сколько шагов (не больше limit) можно пропустить без пошаговой логики"""
+        crowd = self.crowd
+        if self.is_sprinting or self.books or crowd.moving_count():
+            return 0
+        next_time = self.timeline.next_time
+        if self.quest_gate_open():
+            next_time = min(next_time, self.game_time + self.quest_events.next_time - self.quest_clock)
+        # Шаг с ближайшим событием выполняется обычным step()
+        return max(0, min(limit, int((next_time - self.game_time) / SIM_FIXED_DT) - 1))
+
+    def skip(self, count):
+        """Пропустить count шагов без событий: только время, часы заданий и мана
+
+        Суммы копятся тем же прибавлением по шагу, что и в step(), поэтому
+        результат побитово совпадает с пошаговым прогоном.
+        """
+        dt = SIM_FIXED_DT
+        game_time = self.game_time
+        for _ in range(count):
+            game_time += dt
+        self.game_time = game_time
+        if self.quest_gate_open():
+            quest_clock = self.quest_clock
+            for _ in range(count):
+                quest_clock += dt
+            self.quest_clock = quest_clock
+        regen = self.mana_regen_rate * (POWER_ZONE_REGEN_MULT if self.in_power_zone() else 1.0) * dt
+        mana, max_mana = self.mana, self.max_mana
+        for _ in range(count):
+            if mana == max_mana:
+                break                     # Дальше мана упирается в максимум
+            mana = min(max_mana, mana + regen)
+        self.mana = mana
+
+    def day_clock(self, game_time):
+        """Сколько дневного времени прошло к game_time (ночи не считаются)"""
+        half = self.day_duration / 2
+        day, time_of_day = divmod(game_time, self.day_duration)
+        return day * half + min(time_of_day, half)
+
+    def from_day_clock(self, day_time):
+        """Момент игрового времени, когда дневные часы покажут day_time"""
+        day, time_of_day = divmod(day_time, self.day_duration / 2)
+        return day * self.day_duration + time_of_day
+
+    def schedule_day_night(self):
+        """Запланировать ближайшую смену дня и ночи от текущего времени"""
+        day_start = (self.game_time // self.day_duration) * self.day_duration
+        if self.is_night:
+            self.timeline.schedule(day_start + self.day_duration, "daybreak")
+        else:
+            self.timeline.schedule(day_start + self.day_duration / 2, "nightfall")
+
+    def schedule_spawn(self, delay):
+        """Следующий спавн через delay секунд дневного времени"""
+        self.spawn_due = self.from_day_clock(self.day_clock(self.game_time) + delay)
+        self.timeline.schedule(self.spawn_due, "spawn")
+
+    def update_time_system(self, delta_time):
+        """Обновление игрового времени и обработка наступивших событий
+
+        День/ночь и спавн обрабатываются сразу; посетители, у которых кончилось
+        ожидание, возвращаются списком (их переводит update_crowd).
+        """
+        self.game_time += delta_time
+        leaving = []
+        while self.timeline.next_time <= self.game_time:
+            when, kind, payload = self.timeline.pop()
+            if kind == "nightfall":
+                self.is_night = True
+                self.schedule_day_night()
+            elif kind == "daybreak":
+                self.is_night = False
+                self.current_day = int(round(when / self.day_duration))
+                self.schedule_day_night()
+            elif kind == "spawn" and when == self.spawn_due:
+                self.on_spawn_due()
+            elif kind == "leave":
+                leaving.append(payload)
+        return leaving
+
+    def get_time_display(self):
+        """Форматирование времени для отображения"""
+        return format_game_time(self.game_time, self.day_duration)
+
+    # --- Шаг логики ---
+    def step(self, delta_time):
+        """Один шаг игровых правил"""
+        leaving = self.update_time_system(delta_time)
+        self.update_mana(delta_time)
+        if len(self.crowd):
+            self.update_crowd(delta_time, leaving)
+
+    def on_spawn_due(self):
+        """Спавн посетителя днём, пока есть свободные места"""
+        self.spawn_due = None
+        if len(self.crowd) >= self.max_visitors:
+            return                        # Ждём, пока кто-то уйдёт
+        self.spawn_visitor()
+        if len(self.crowd) < self.max_visitors:
+            self.schedule_spawn(self.rng.uniform(*self.spawn_interval))
+
+    def quest_gate_open(self):
+        """Идут ли часы заданий: есть ждущие, нет книг и активного задания"""
+        return not self.books and not self.quest_active and self.crowd.counts[WAITING] > 0
+
+    def in_power_zone(self):
+        """Стоит ли игрок в зоне силы (ответ кэшируется до сдвига игрока)"""
+        position = (self.player_x, self.player_y)
+        if position != self._zone_position:
+            self._zone_position = position
+            self._in_zone = bool(self.zone_index.within_radius(self.player_x, self.player_y, POWER_ZONE_SIZE))
+        return self._in_zone
+
+    def update_mana(self, delta_time):
+        """Расход маны при беге и регенерация (в 3 раза быстрее в зоне силы)"""
+        if self.is_sprinting:
+            self.mana = max(0.0, self.mana - SPRINT_MANA_COST * delta_time)
+
+        regen_mult = POWER_ZONE_REGEN_MULT if self.in_power_zone() else 1.0
+        self.mana = min(self.max_mana, self.mana + self.mana_regen_rate * regen_mult * delta_time)
+
+    def add_book(self, book):
+        self.books[book.id] = book
+        self.owner_books[book.owner] = book
+        self.book_index.insert(book.id, book.x, book.y)
+
+    def remove_book(self, book):
+        del self.books[book.id]
+        self.owner_books.pop(book.owner, None)
+        self.book_index.remove(book.id)
+
+    def own_books(self, indices):
+        """Книга каждого из посетителей с данными индексами (None — своей книги нет)"""
+        return [self.owner_books.get(visitor_id) for visitor_id in self.crowd.ids[indices].tolist()]
+
+    def take_books(self, indices, books):
+        """Посетители забирают свои книги в радиусе взаимодействия; маска успевших"""
+        crowd = self.crowd
+        took = np.zeros(len(indices), dtype=bool)
+        for j, (book, x, y) in enumerate(zip(books, crowd.x[indices].tolist(), crowd.y[indices].tolist())):
+            if book is not None and book.id in self.book_index.within_radius(x, y, INTERACTION_DISTANCE):
+                self.remove_book(book)
+                took[j] = True
+        taken = int(took.sum())
+        self.score += BOOK_REWARD * taken
+        self.visitors_helped += taken
+        return took
+
+    def update_crowd(self, delta_time, leaving=()):
+        """Переходы состояний и движение всей толпы за один шаг
+
+        leaving — id посетителей, чьё ожидание у стола кончилось к этому шагу.
+        """
+        crowd = self.crowd
+        counts = crowd.counts
+        arrived = crowd.move(delta_time, self.navigator) if crowd.moving_count() else ()
+        if counts[WAITING] and not self.books and not self.quest_active:
+            # Ждём, пока игрок сбросит книгу: часы заданий идут только сейчас
+            self.quest_clock += delta_time
+            self.start_due_quest()
+        if not len(arrived) and not leaving and not (counts[WAITING] and self.books):
+            return                        # Состояния не меняются: массивы не трогаем
+
+        state = crowd.view("state").copy()    # Состояния на начало шага
+        new_state = crowd.view("state")
+        target_x = crowd.view("target_x")
+        field = crowd.view("field")
+        timer = crowd.view("timer")
+
+        if counts[WAITING] and self.books:
+            # За книгой идёт только тот, для кого её сбросили
+            waiting = np.flatnonzero(state == WAITING)
+            books = self.own_books(waiting)
+            took = self.take_books(waiting, books)
+            going = [j for j, book in enumerate(books) if book is not None and not took[j]]
+            if going:
+                book_xs = [books[j].x for j in going]
+                target_x[waiting[going]] = book_xs
+                field[waiting[going]] = [self.navigator.destination(x, VISITOR_Y) for x in book_xs]
+                new_state[waiting[going]] = GOING_TO_BOOK
+            took = waiting[took]
+            new_state[took] = RETURNING_TO_TABLE
+            target_x[took] = self.table_xs[crowd.table[took]]
+            field[took] = self.table_fields[crowd.table[took]]
+
+        if leaving:
+            done_waiting = (state == POST_INTERACTION_WAIT) & np.isin(crowd.view("ids"), leaving) & \
+                (self.game_time >= timer)
+            new_state[done_waiting] = LEAVING
+            target_x[done_waiting] = VISITOR_EXIT_X
+            field[done_waiting] = self.exit_field
+
+        if not len(arrived):
+            crowd.recount()
+            return
+        arrived_state = np.full(len(state), -1, dtype=state.dtype)
+        arrived_state[arrived] = state[arrived]
+
+        seated = np.flatnonzero(arrived_state == ARRIVING)
+        if len(seated):
+            # Задержка задания отсчитывается по часам заданий с момента прихода
+            new_state[seated] = WAITING
+            timer[seated] += self.quest_clock
+            for visitor_id, when in zip(crowd.ids[seated].tolist(), timer[seated].tolist()):
+                self.quest_events.schedule(when, "quest", visitor_id)
+
+        at_book = np.flatnonzero(arrived_state == GOING_TO_BOOK)
+        if len(at_book):
+            if self.books:
+                self.take_books(at_book, self.own_books(at_book))
+            new_state[at_book] = RETURNING_TO_TABLE
+            target_x[at_book] = self.table_xs[crowd.table[at_book]]
+            field[at_book] = self.table_fields[crowd.table[at_book]]
+
+        at_table = np.flatnonzero(arrived_state == RETURNING_TO_TABLE)
+        if len(at_table):
+            new_state[at_table] = POST_INTERACTION_WAIT
+            timer[at_table] = self.game_time + VISITOR_POST_WAIT
+            for visitor_id in crowd.ids[at_table].tolist():
+                self.timeline.schedule(self.game_time + VISITOR_POST_WAIT, "leave", visitor_id)
+
+        crowd.recount()
+        gone = np.flatnonzero(arrived_state == LEAVING)
+        if len(gone):
+            # Ушли — освобождаем места
+            if self.quest_owner in crowd.ids[gone]:
+                self.quest_active = False
+                self.target_bookshelf = None
+                self.quest_owner = None
+            crowd.remove(gone)
+            if self.spawn_due is None:
+                self.schedule_spawn(self.rng.uniform(*self.respawn_delay))
+
+    def start_due_quest(self):
+        """Выдать задание первому ждущему, чья задержка истекла по часам заданий"""
+        crowd = self.crowd
+        while self.quest_events.next_time <= self.quest_clock:
+            when, _, visitor_id = self.quest_events.pop()
+            index = np.flatnonzero(crowd.view("ids") == visitor_id)
+            # Ушедших, получивших задание или книгу — пропускаем
+            if len(index) and crowd.state[index[0]] == WAITING and not crowd.quest_done[index[0]] \
+                    and crowd.timer[index[0]] == when:
+                self.start_quest(int(index[0]))
+                return
+
+    # --- Действия ---
+    def spawn_visitor(self):
+        """Создание нового посетителя у входа"""
+        if len(self.crowd) >= self.max_visitors or not self.tables:
+            return
+        table = self.rng.randrange(len(self.tables))
+        self.crowd.spawn(VISITOR_ENTRANCE_X, VISITOR_Y, self.tables[table][0], VISITOR_Y,
+                         int(self.table_fields[table]), table,
+                         self.rng.uniform(*self.quest_delay_range))
+
+    def start_quest(self, index):
+        """Активация квеста для посетителя index: выбрать шкаф для книги"""
+        crowd = self.crowd
+        if index >= crowd.count or crowd.state[index] != WAITING:
+            return
+        crowd.quest_done[index] = True
+        self.quest_active = True
+        self.quest_owner = int(crowd.ids[index])
+        self.target_bookshelf = self.rng.randrange(len(self.bookshelves))
+
+    def interact(self):
+        """Сброс книги из целевого шкафа (требует ману); True при успехе"""
+        if not self.quest_active or self.target_bookshelf is None:
+            return False
+        nearby = self.shelf_index.within_radius(self.player_x, self.player_y, INTERACTION_DISTANCE)
+        if self.target_bookshelf not in nearby or self.mana < self.mana_cost_interaction:
+            return False
+
+        book = Book(self._new_id(), self.bookshelves[self.target_bookshelf][0], FLOATING_BOOK_Y,
+                    self.quest_owner)
+        self.add_book(book)
+        self.mana -= self.mana_cost_interaction
+        self.quest_active = False
+        self.events.append("book_drop")
+        return True
+
+    def pop_events(self):
+        """Забрать накопленные события"""
+        events, self.events = self.events, []
+        return events
+
+    # --- Снимок состояния ---
+    def snapshot(self):
+        """Полное состояние мира; массивы толпы — отдельно, копиями"""
+        state = {name: getattr(self, name) for name in self.SNAPSHOT_FIELDS}
+        version, internal, gauss = self.rng.getstate()
+        state["rng"] = [version, list(internal), gauss]
+        state["books"] = [[book.id, book.x, book.y, book.owner] for book in self.books.values()]
+        state["crowd_next_id"] = self.crowd.next_id
+        return state, self.crowd.snapshot()
+
+    def check_snapshot(self, state, crowd_arrays):
+        """SaveError, если снимок не той схемы, что пишет snapshot() (мир не меняется)"""
+        missing = [name for name in self.SNAPSHOT_FIELDS + ("rng", "books", "crowd_next_id")
+                   if name not in state]
+        missing += [name for name in VisitorCrowd.FIELDS if name not in crowd_arrays]
+        if missing:
+            raise SaveError(f"в снимке нет полей: {', '.join(missing)}")
+        if len({len(values) for values in crowd_arrays.values()}) > 1:
+            raise SaveError("массивы посетителей разной длины")
+        if any(not isinstance(book, list) or len(book) != 4 for book in state["books"]):
+            raise SaveError("книга не в формате [id, x, y, владелец]")
+        try:
+            version, internal, gauss = state["rng"]
+            random.Random().setstate((version, tuple(internal), gauss))
+        except (TypeError, ValueError) as error:
+            raise SaveError(f"состояние генератора повреждено ({error})") from error
+
+    def restore(self, state, crowd_arrays):
+        """Восстановить мир из snapshot(); SaveError, если снимок не той схемы"""
+        self.check_snapshot(state, crowd_arrays)
+        for name in self.SNAPSHOT_FIELDS:
+            setattr(self, name, state[name])
+        version, internal, gauss = state["rng"]
+        self.rng.setstate((version, tuple(internal), gauss))
+
+        self.books = {}
+        self.owner_books = {}
+        self.book_index.clear()
+        for book_id, x, y, owner in state["books"]:
+            self.add_book(Book(book_id, x, y, owner))
+        crowd = self.crowd
+        crowd.restore(crowd_arrays, state["crowd_next_id"])
+        # Номера полей зависят от карты — берём заново по точкам целей
+        crowd.view("field")[:] = [self.navigator.destination(x, y) for x, y in
+                                  zip(crowd.view("target_x").tolist(), crowd.view("target_y").tolist())]
+        self.rebuild_schedule()
+        self.events = []
+
+    def rebuild_schedule(self):
+        """Очереди событий заново по состоянию мира (после загрузки)"""
+        self.timeline.clear()
+        self.quest_events.clear()
+        self.schedule_day_night()
+        if self.spawn_due is not None:
+            self.timeline.schedule(self.spawn_due, "spawn")
+        crowd = self.crowd
+        state, timer, ids = crowd.view("state"), crowd.view("timer"), crowd.view("ids")
+        for i in np.flatnonzero(state == POST_INTERACTION_WAIT).tolist():
+            self.timeline.schedule(float(timer[i]), "leave", int(ids[i]))
+        for i in np.flatnonzero((state == WAITING) & ~crowd.view("quest_done")).tolist():
+            self.quest_events.schedule(float(timer[i]), "quest", int(ids[i]))
+
+
+# === БОТ ДЛЯ HEADLESS-ПРОГОНА ===
+class GhostBot:
+    """Простая стратегия игрока: идти к целевому шкафу, иначе ждать в зоне силы"""
+
+    def __init__(self, sim, start_x, start_y):
+        self.sim = sim
+        self.speed = SPEED * 60           # SPEED задан в пикселях за кадр при 60 FPS
+        sim.player_x, sim.player_y = start_x, start_y
+
+    def update(self, delta_time):
+        sim = self.sim
+        if sim.quest_active and sim.target_bookshelf is not None:
+            target_x, target_y = sim.bookshelves[sim.target_bookshelf]
+        else:
+            target_x, target_y = sim.power_zones[0]
+
+        dx, dy = target_x - sim.player_x, target_y - sim.player_y
+        dist = math.hypot(dx, dy)
+        step = self.speed * delta_time
+        if dist > step:
+            sim.player_x += dx / dist * step
+            sim.player_y += dy / dist * step
+        else:
+            sim.player_x, sim.player_y = target_x, target_y
+
+        if sim.quest_active and dist < INTERACTION_DISTANCE:
+            sim.interact()
+
+    def idle(self):
+        """Бот стоит в зоне силы без задания — его update() ничего не меняет"""
+        sim = self.sim
+        return not sim.quest_active and (sim.player_x, sim.player_y) == sim.power_zones[0]
+
+
+# === ПАКЕТНЫЙ ПРОГОН ===
+def run_session(seed, days=7, map_size=None, overrides=None, sample_interval=5.0):
+    """Прогнать days игровых дней с ботом; итоговые метрики и кривая маны"""
+    map_width, map_height = map_size or read_map_size()
+    sim = LibrarySimulation(map_width, map_height, seed=seed, overrides=overrides)
+    bot = GhostBot(sim, 7 * 64 + 32, 5 * 64 + 32)
+
+    total_steps = int(round(days * sim.day_duration / SIM_FIXED_DT))
+    sample_every = max(1, int(round(sample_interval / SIM_FIXED_DT)))
+    mana_curve = []
+    i = 0
+    while i < total_steps:
+        # Пока бот ждёт в зоне силы, пустые шаги до события или замера пропускаются разом
+        next_sample = -(-i // sample_every) * sample_every
+        count = sim.idle_steps(min(total_steps, next_sample + 1) - i) if bot.idle() else 0
+        if count > 1:
+            sim.skip(count)
+        else:
+            count = 1
+            bot.update(SIM_FIXED_DT)
+            sim.step(SIM_FIXED_DT)
+        i += count
+        if (i - 1) % sample_every == 0:
+            mana_curve.append(sim.mana)
+    return {
+        "seed": seed,
+        "score": sim.score,
+        "visitors_helped": sim.visitors_helped,
+        "mana_curve": mana_curve,
+    }
+
+
+def _run_session_args(args):
+    return run_session(*args)
+
+
+def run_batch(seeds, days=7, overrides=None, workers=None, sample_interval=5.0):
+    """Прогнать серию сидов на пуле процессов"""
+    map_size = read_map_size()
+    jobs = [(seed, days, map_size, overrides, sample_interval) for seed in seeds]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_run_session_args, jobs, chunksize=max(1, len(jobs) // 64)))
+
+
+def summarize(results):
+    """Сводка: средние/мин/макс очков и помощи, средняя кривая маны"""
+    def stats(values):
+        return {"mean": sum(values) / len(values), "min": min(values), "max": max(values)}
+
+    curves = [r["mana_curve"] for r in results]
+    length = min(len(c) for c in curves)
+    mean_curve = [sum(c[i] for c in curves) / len(curves) for i in range(length)]
+    return {
+        "runs": len(results),
+        "score": stats([r["score"] for r in results]),
+        "visitors_helped": stats([r["visitors_helped"] for r in results]),
+        "mana_curve": mean_curve,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Пакетная headless-симуляция библиотеки")
+    parser.add_argument("--runs", type=int, default=1000, help="число сидов")
+    parser.add_argument("--days", type=float, default=7, help="игровых дней на прогон")
+    parser.add_argument("--seed", type=int, default=0, help="первый сид")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--day-duration", type=float, help="переопределить DAY_DURATION")
+    parser.add_argument("--mana-cost", type=float, help="переопределить MANA_COST_INTERACTION")
+    parser.add_argument("--max-visitors", type=int, help="посетителей одновременно (загруженный день)")
+    args = parser.parse_args()
+
+    overrides = {}
+    if args.day_duration is not None:
+        overrides["day_duration"] = args.day_duration
+    if args.mana_cost is not None:
+        overrides["mana_cost_interaction"] = args.mana_cost
+    if args.max_visitors is not None:
+        overrides["max_visitors"] = args.max_visitors
+
+    start = time.perf_counter()
+    results = run_batch(range(args.seed, args.seed + args.runs), args.days,
+                        overrides=overrides, workers=args.workers)
+    elapsed = time.perf_counter() - start
+    summary = summarize(results)
+    cores = min(args.workers, os.cpu_count() or 1)
+
+    print(f"Прогонов: {summary['runs']} × {args.days} дн. за {elapsed:.2f} с "
+          f"({elapsed * cores / summary['runs']:.3f} с/прогон на ядро)")
+    for key in ("score", "visitors_helped"):
+        s = summary[key]
+        print(f"{key}: среднее {s['mean']:.1f}, мин {s['min']}, макс {s['max']}")
+    curve = summary["mana_curve"]
+    step = max(1, len(curve) // 12)
+    print("Мана:", " ".join(f"{m:.0f}" for m in curve[::step]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Равномерная сетка (spatial hash) для запросов близости.
+
+Объекты раскладываются по ячейкам тайловой сетки карты (70 px), поэтому
+within_radius() просматривает только соседние ячейки: стоимость запроса
+зависит от плотности объектов рядом, а не от их общего числа.
+"""
+import math
+
+from constants import TILE_SIZE
+
+
+class SpatialHash:
+    """Индекс точечных объектов: ключ → позиция и ячейка сетки"""
+
+    def __init__(self, cell_size=TILE_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}        # (cx, cy) -> {key: (x, y)}
+        self.positions = {}    # key -> (x, y, cell)
+
+    def _cell(self, x, y):
+        return int(x // self.cell_size), int(y // self.cell_size)
+
+    # --- Изменение ---
+    def insert(self, key, x, y):
+        """Добавить объект (ключ должен быть новым)"""
+        cell = self._cell(x, y)
+        self.cells.setdefault(cell, {})[key] = (x, y)
+        self.positions[key] = (x, y, cell)
+
+    def remove(self, key):
+        """Убрать объект из индекса"""
+        _, _, cell = self.positions.pop(key)
+        bucket = self.cells[cell]
+        del bucket[key]
+        if not bucket:
+            del self.cells[cell]
+
+    def clear(self):
+        self.cells.clear()
+        self.positions.clear()
+
+    # --- Запросы ---
+    def within_radius(self, x, y, radius):
+        """Ключи объектов на расстоянии строго меньше radius"""
+        if not self.positions:
+            return []
+        min_cx, min_cy = self._cell(x - radius, y - radius)
+        max_cx, max_cy = self._cell(x + radius, y + radius)
+        found = []
+        for cx in range(min_cx, max_cx + 1):
+            for cy in range(min_cy, max_cy + 1):
+                bucket = self.cells.get((cx, cy))
+                if not bucket:
+                    continue
+                for key, (ox, oy) in bucket.items():
+                    if math.hypot(x - ox, y - oy) < radius:
+                        found.append(key)
+        return found
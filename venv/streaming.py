@@ -0,0 +1,287 @@
+"""Потоковая загрузка тайловой карты чанками с отсечением по камере.
+
+Слои карты хранятся компактно — сеткой gid (NumPy) — и режутся на чанки
+CHUNK_TILES × CHUNK_TILES тайлов. Спрайты создаются только для чанков вокруг
+камеры и выгружаются, когда камера уходит дальше запаса; рисуются лишь
+чанки в кадре, а физика проверяет стены только рядом с игроком. Память и
+стоимость кадра зависят от размера экрана, а не от размера библиотеки.
+
+Чанки запаса строятся заранее по рядам тайлов, не дольше CHUNK_BUILD_BUDGET
+за кадр, поэтому к моменту входа в кадр они обычно уже готовы и кадр не
+проседает; сразу целиком строится только чанк, который уже виден.
+
+Замер на сгенерированных картах:  python streaming.py --rooms 2x2,8x8,16x16
+"""
+import argparse
+import gc
+import time
+
+import arcade
+import numpy as np
+
+from assets import ASSETS, tileset_image_path
+from constants import SCREEN_WIDTH, SCREEN_HEIGHT, TILE_SIZE, MAP_NAME
+from tmx import COLLISION_LAYER, layer_grids
+
+STREAMED_LAYERS = ["walls behind", "walls", "objects", "power_zones", "collision"]
+CHUNK_TILES = 16                      # Сторона чанка в тайлах
+LOAD_MARGIN = 1                       # Чанков запаса вокруг кадра (грузятся заранее)
+CHUNK_BUILD_BUDGET = 0.002            # Секунд за кадр на постройку чанков запаса
+BENCHMARK_PAN = 12                    # Пикселей за кадр у камеры замера — на любой карте одинаково
+
+
+class TilesetTextures:
+    """Текстура по gid: вырезается из изображения тайлсета (общий кэш ASSETS) при первом запросе"""
+
+    def __init__(self, tiled_map):
+        self.tiled_map = tiled_map
+        self.tilesets = sorted(tiled_map.tilesets.items())     # [(firstgid, Tileset)]
+        self.cache = {}                                        # gid -> Texture
+
+    def _image(self, path):
+        return ASSETS.get("image", tileset_image_path(self.tiled_map, path))
+
+    def get(self, gid):
+        texture = self.cache.get(gid)
+        if texture is not None:
+            return texture
+        firstgid, tileset = next((first, ts) for first, ts in reversed(self.tilesets) if first <= gid)
+        local_id = gid - firstgid
+        tile = (tileset.tiles or {}).get(local_id)
+        if tile is not None and tile.image is not None:
+            # Тайлсет-коллекция: у тайла своё изображение
+            texture = self._image(tile.image)
+        else:
+            col, row = local_id % tileset.columns, local_id // tileset.columns
+            x = tileset.margin + col * (tileset.tile_width + tileset.spacing)
+            y = tileset.margin + row * (tileset.tile_height + tileset.spacing)
+            texture = self._image(tileset.image).crop(x, y, tileset.tile_width, tileset.tile_height)
+        self.cache[gid] = texture
+        return texture
+
+
+class ChunkedTileMap:
+    """Слои карты, загружаемые чанками вокруг камеры"""
+
+    def __init__(self, grids, texture_for, tile_width=TILE_SIZE, tile_height=TILE_SIZE,
+                 chunk_tiles=CHUNK_TILES, margin=LOAD_MARGIN):
+        self.grids = grids
+        self.texture_for = texture_for    # gid -> arcade.Texture
+        self.tile_width = tile_width
+        self.tile_height = tile_height
+        self.chunk_tiles = chunk_tiles
+        self.margin = margin
+        self.rows, self.columns = next(iter(grids.values())).shape
+        self.width = self.columns * tile_width
+        self.height = self.rows * tile_height
+        self.chunk_columns = -(-self.columns // chunk_tiles)
+        self.chunk_rows = -(-self.rows // chunk_tiles)
+
+        self.chunks = {}                  # (cx, cy) -> {слой: SpriteList}; cy = 0 — низ карты
+        self.building = {}                # (cx, cy) -> недостроенный чанк (генератор)
+        self.visible = []                 # Чанки в кадре (рисуются)
+        self.loads = 0
+        self.unloads = 0
+
+    @classmethod
+    def from_tiled_map(cls, tiled_map, **kwargs):
+        return cls(layer_grids(tiled_map, STREAMED_LAYERS), TilesetTextures(tiled_map).get,
+                   tiled_map.tile_size.width, tiled_map.tile_size.height, **kwargs)
+
+    # --- Чанки ---
+    def _chunk_range(self, left, bottom, right, top, margin):
+        """Прямоугольник чанков, задевающих область (с запасом margin), в пределах карты"""
+        chunk_w, chunk_h = self.chunk_tiles * self.tile_width, self.chunk_tiles * self.tile_height
+        min_cx = max(0, int(left // chunk_w) - margin)
+        min_cy = max(0, int(bottom // chunk_h) - margin)
+        max_cx = min(self.chunk_columns - 1, int(right // chunk_w) + margin)
+        max_cy = min(self.chunk_rows - 1, int(top // chunk_h) + margin)
+        return [(cx, cy) for cx in range(min_cx, max_cx + 1) for cy in range(min_cy, max_cy + 1)]
+
+    def _chunk_builder(self, cx, cy):
+        """Спрайты тайлов одного чанка по всем слоям; уступает управление после каждого ряда"""
+        n = self.chunk_tiles
+        col0 = cx * n
+        # Ряды сетки идут сверху вниз, чанки — снизу вверх
+        row_end = self.rows - cy * n
+        row0 = max(0, row_end - n)
+        layers = {}
+        for name, grid in self.grids.items():
+            if name == COLLISION_LAYER:
+                sprites = arcade.SpriteList(use_spatial_hash=True, spatial_hash_cell_size=TILE_SIZE)
+            else:
+                sprites = arcade.SpriteList(lazy=True)
+            layers[name] = sprites
+            block = grid[row0:row_end, col0:col0 + n]
+            for row in range(block.shape[0]):
+                for col in np.flatnonzero(block[row]).tolist():
+                    texture = self.texture_for(int(block[row, col]))
+                    sprites.append(arcade.Sprite(
+                        texture,
+                        scale=self.tile_width / texture.width,
+                        center_x=(col0 + col + 0.5) * self.tile_width,
+                        center_y=(self.rows - row0 - row - 0.5) * self.tile_height,
+                    ))
+                yield
+        self.chunks[cx, cy] = layers
+        self.loads += 1
+
+    def _build(self, key, deadline=None):
+        """Строить чанк до готовности или до deadline (perf_counter); готов ли он"""
+        builder = self.building.get(key)
+        if builder is None:
+            builder = self.building[key] = self._chunk_builder(*key)
+        for _ in builder:
+            if deadline is not None and time.perf_counter() >= deadline:
+                return False
+        del self.building[key]
+        return True
+
+    def update(self, left, bottom, right, top, budget=CHUNK_BUILD_BUDGET):
+        """Подгрузить чанки вокруг кадра, выгрузить далёкие, запомнить видимые
+
+        Видимые чанки строятся сразу, запас — от ближайших к центру кадра, пока
+        не истёк budget секунд (None — весь запас за один вызов).
+        """
+        start = time.perf_counter()
+        in_view = self._chunk_range(left, bottom, right, top, 0)
+        for key in in_view:
+            if key not in self.chunks:
+                self._build(key)
+        chunk_w, chunk_h = self.chunk_tiles * self.tile_width, self.chunk_tiles * self.tile_height
+        center_x, center_y = (left + right) / 2 / chunk_w - 0.5, (bottom + top) / 2 / chunk_h - 0.5
+        ahead = sorted((key for key in self._chunk_range(left, bottom, right, top, self.margin)
+                        if key not in self.chunks),
+                       key=lambda key: (key[0] - center_x) ** 2 + (key[1] - center_y) ** 2)
+        deadline = None if budget is None else start + budget
+        for key in ahead:
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            self._build(key, deadline)
+        # Выгружаем с запасом ещё в один чанк, чтобы не грузить заново на границе
+        keep = set(self._chunk_range(left, bottom, right, top, self.margin + 1))
+        for key in [key for key in self.chunks if key not in keep]:
+            del self.chunks[key]
+            self.unloads += 1
+        for key in [key for key in self.building if key not in keep]:
+            del self.building[key]
+        self.visible = in_view
+
+    def update_for_camera(self, camera):
+        half_w = camera.viewport_width / 2 / camera.zoom
+        half_h = camera.viewport_height / 2 / camera.zoom
+        x, y = camera.position
+        self.update(x - half_w, y - half_h, x + half_w, y + half_h)
+
+    # --- Отрисовка и столкновения ---
+    def draw(self, layer):
+        """Нарисовать слой только в чанках, попавших в кадр"""
+        for key in self.visible:
+            sprites = self.chunks[key].get(layer)
+            if sprites:
+                sprites.draw()
+
+    def collision_lists(self, x, y):
+        """Списки стен загруженных чанков вокруг точки (для физики игрока)"""
+        chunk_w, chunk_h = self.chunk_tiles * self.tile_width, self.chunk_tiles * self.tile_height
+        cx, cy = int(x // chunk_w), int(y // chunk_h)
+        lists = []
+        for key in self._chunk_range(cx * chunk_w, cy * chunk_h, cx * chunk_w, cy * chunk_h, 1):
+            sprites = self.chunks.get(key, {}).get(COLLISION_LAYER)
+            if sprites:
+                lists.append(sprites)
+        return lists
+
+    @property
+    def sprite_count(self):
+        return sum(len(sprites) for layers in self.chunks.values() for sprites in layers.values())
+
+
+def generate_library(grids, rooms_x, rooms_y):
+    """Большая библиотека: комнаты исходной карты, уложенные сеткой rooms_x × rooms_y"""
+    return {name: np.tile(grid, (rooms_y, rooms_x)) for name, grid in grids.items()}
+
+
+# === ЗАМЕР ===
+def benchmark(rooms_x=8, rooms_y=8, frames=600, map_name=MAP_NAME, pan=BENCHMARK_PAN):
+    """Кадр при проходе камеры по большой карте: все слои целиком против чанков"""
+    from hud import DrawCallCounter
+
+    window = arcade.Window(SCREEN_WIDTH, SCREEN_HEIGHT, "Streaming benchmark", visible=False)
+    tiled_map = ASSETS.get("map", map_name)
+    textures = TilesetTextures(tiled_map)
+    grids = generate_library(layer_grids(tiled_map, STREAMED_LAYERS), rooms_x, rooms_y)
+    tile_w, tile_h = tiled_map.tile_size.width, tiled_map.tile_size.height
+    camera = arcade.camera.Camera2D()
+    probe = arcade.SpriteSolidColor(40, 40, color=arcade.color.WHITE)
+    results = {}
+
+    for name in ("full", "chunked"):
+        if name == "full":
+            # Прежний путь: все тайлы слоя в одном SpriteList (как arcade.TileMap)
+            level = ChunkedTileMap(grids, textures.get, tile_w, tile_h,
+                                   chunk_tiles=max(next(iter(grids.values())).shape))
+            level.update(0, 0, level.width, level.height)
+        else:
+            level = ChunkedTileMap(grids, textures.get, tile_w, tile_h)
+        gc.collect()                      # Мусор прошлого прохода не должен попасть в замер
+        span = max(level.width - SCREEN_WIDTH, 1)
+        times, collide_times, peak_sprites = [], [], 0
+        with DrawCallCounter() as counter:
+            for frame in range(frames):
+                # Камера с постоянной скоростью: туда-обратно по x, волна по y
+                distance = frame * pan
+                x = SCREEN_WIDTH / 2 + span - abs(distance % (2 * span) - span)
+                y = level.height / 2 + SCREEN_HEIGHT / 2 * np.sin(distance / SCREEN_WIDTH)
+                camera.position = (x, y)
+                start = time.perf_counter()
+                if name == "chunked":
+                    level.update_for_camera(camera)
+                walls = level.collision_lists(x, y)
+                probe.position = (x, y)
+                for sprites in walls:
+                    arcade.check_for_collision_with_list(probe, sprites)
+                collide_times.append(time.perf_counter() - start)
+                window.clear()
+                camera.use()
+                for layer in STREAMED_LAYERS[:-1]:
+                    level.draw(layer)
+                window.ctx.finish()
+                times.append(time.perf_counter() - start)
+                peak_sprites = max(peak_sprites, level.sprite_count)
+        times.sort()
+        results[name] = {
+            "mean_ms": sum(times) / frames * 1000,
+            "p95_ms": times[int(frames * 0.95)] * 1000,
+            "p99_ms": times[int(frames * 0.99)] * 1000,
+            "max_ms": times[-1] * 1000,
+            "collide_ms": sum(collide_times) / frames * 1000,
+            "draw_calls": counter.count / frames,
+            "sprites": peak_sprites,
+            "loads": level.loads,
+        }
+        # Полная карта не должна жить во время прохода чанками (паузы сборщика мусора)
+        del level, walls
+        gc.collect()
+    window.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Замер потоковой загрузки карты чанками")
+    parser.add_argument("--rooms", default="2x2,8x8,16x16",
+                        help="размеры карты через запятую: комнат по горизонтали x вертикали")
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--map", default=MAP_NAME, help="карта-комната, из которой собирается библиотека")
+    args = parser.parse_args()
+    for size in args.rooms.split(","):
+        rooms_x, rooms_y = (int(n) for n in size.split("x"))
+        print(f"{size}:")
+        for name, r in benchmark(rooms_x, rooms_y, args.frames, args.map).items():
+            print(f"{name:>8}: {r['mean_ms']:.3f} мс/кадр (p95 {r['p95_ms']:.3f}, p99 {r['p99_ms']:.3f}, "
+                  f"макс {r['max_ms']:.3f}), "
+                  f"столкновения {r['collide_ms']:.3f} мс, {r['draw_calls']:.1f} draw-вызовов/кадр, "
+                  f"спрайтов в памяти {r['sprites']}, загрузок чанков {r['loads']}")
+
+if __name__ == "__main__":
+    main()
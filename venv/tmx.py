@@ -0,0 +1,42 @@
+"""Сетки gid тайловых слоёв карты Tiled — один разбор для игры и симуляции.
+
+Данные слоёв декодирует pytiled_parser. Модуль не импортирует arcade и
+умеет читать отдельный слой без разбора тайлсетов, поэтому им пользуются и
+потоковая карта (streaming.py), и headless-симуляция с пакетным прогоном.
+"""
+import xml.etree.ElementTree as ET
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+from pytiled_parser.parsers.tmx.layer import parse as parse_layer
+
+from constants import MAP_NAME
+
+COLLISION_LAYER = "collision"
+GID_MASK = 0x1FFFFFFF                 # Без флагов отражения Tiled
+
+
+def layer_grid(layer):
+    """Сетка gid тайлового слоя pytiled (строка 0 — верх карты, как в Tiled)"""
+    return np.asarray(layer.data, dtype=np.uint32) & GID_MASK
+
+
+def layer_grids(tiled_map, names):
+    """Сетки gid тайловых слоёв разобранной карты по именам"""
+    grids = {}
+    for layer in tiled_map.layers:
+        if layer.name in names and getattr(layer, "data", None) is not None:
+            grids[layer.name] = layer_grid(layer)
+    return grids
+
+
+@lru_cache(maxsize=None)
+def read_layer_grid(map_name=MAP_NAME, layer_name=COLLISION_LAYER):
+    """Сетка одного слоя прямо из .tmx, без тайлсетов; None без слоя"""
+    for raw_layer in ET.parse(map_name).getroot().findall("layer"):
+        if raw_layer.get("name") == layer_name:
+            grid = layer_grid(parse_layer(raw_layer, "utf-8", Path(map_name).parent))
+            grid.flags.writeable = False   # Общая для всех симуляций процесса
+            return grid
+    return None